@@ -3,28 +3,75 @@ Indieflix Backend API
 Flask API to serve movie theater schedules from PostgreSQL
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from dotenv import load_dotenv
+from cachetools import TTLCache
+import orjson
+import pandas as pd
+import pyarrow as pa
 import sys
 import os
 import subprocess
+from threading import Lock
 from pathlib import Path
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 # Load .env file FIRST (before other imports that might need it)
 load_dotenv(Path(__file__).parent.parent.parent / '.env')
 
 # Add deng utils to path to access database functions
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'deng' / 'utils'))
-from storage.postgres import db_select_df, db_select, create_tables
+from storage.postgres import (
+    db_select_df, db_select_arrow, db_select_json, db_select_records, db_copy_df, db_iter, db_select,
+    create_tables, get_pool, refresh_recent_movies
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson instead of stdlib json"""
+    
+    @staticmethod
+    def _default(obj):
+        # orjson only handles exact datetime instances, not subclasses like pandas Timestamp
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        # NUMERIC columns (e.g. tmdb_rating) come back from psycopg2 as Decimal
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return DefaultJSONProvider.default(obj)
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self._default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 # Configure Flask app
 app = Flask(__name__, 
             static_folder='../../frontend',
             static_url_path='')
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend access
 
+# Compress API responses (brotli preferred, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIMETYPES'] = [
+    'application/json',
+    'application/vnd.apache.arrow.stream',
+    'text/html',
+    'text/css',
+    'application/javascript',
+]
+Compress(app)
+
 # Get admin secret from environment
 ADMIN_SECRET = os.getenv('ADMIN_SECRET', 'change-me-in-production')
 
@@ -35,6 +82,66 @@ try:
 except Exception as e:
     print(f"⚠️  Warning: Could not initialize database tables: {e}")
 
+# Timestamp columns that get serialized as ISO strings in API responses
+DATETIME_COLUMNS = ('scraped_at', 'enriched_at', 'created_at', 'updated_at')
+
+
+def _df_to_records(df: pd.DataFrame) -> list:
+    """Convert a query DataFrame to JSON-safe records (ISO timestamps, NaN/NaT -> None)"""
+    # Queries that format with to_char(...) already return ISO strings
+    for col in DATETIME_COLUMNS:
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    
+    # Replace NaN/NaT with None in one vectorized pass
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+# Serialized response cache - data only changes when scrapers/enrichment run
+_resp_cache = TTLCache(maxsize=256, ttl=int(os.getenv('API_CACHE_TTL', 60)))
+_resp_cache_lock = Lock()
+
+
+def _cached_response(key: tuple, build_payload, mimetype: str = 'application/json') -> Response:
+    """
+    Return the cached body for key, building it on a miss
+    
+    build_payload returns either a JSON-serializable payload or raw bytes
+    (already encoded in mimetype).
+    """
+    with _resp_cache_lock:
+        body = _resp_cache.get(key)
+    
+    if body is None:
+        payload = build_payload()
+        body = payload if isinstance(payload, bytes) else app.json.dumps(payload).encode()
+        with _resp_cache_lock:
+            _resp_cache[key] = body
+    
+    return Response(body, mimetype=mimetype)
+
+
+def clear_response_cache() -> None:
+    """Drop all cached responses (call after the movies table changes)"""
+    with _resp_cache_lock:
+        _resp_cache.clear()
+
+
+def get_db():
+    """Get this request's database connection, borrowing one from the pool on first use"""
+    if 'db_conn' not in g:
+        g.db_conn = get_pool().getconn()
+    return g.db_conn
+
+
+@app.teardown_appcontext
+def release_db(exception):
+    """Return the request's database connection to the pool"""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        get_pool().putconn(conn)
+
 
 # Serve frontend
 @app.route('/')
@@ -56,7 +163,7 @@ def health_check():
     """Health check endpoint for Render and monitoring"""
     try:
         # Test database connection
-        db_select("SELECT 1")
+        db_select("SELECT 1", conn=get_db())
         db_status = 'connected'
     except Exception as e:
         db_status = f'error: {str(e)}'
@@ -69,6 +176,121 @@ def health_check():
     })
 
 
+# /api/movies query variants, kept as module constants so each is built once
+# and can be reused as a server-side prepared statement
+# Recent variants read mv_recent_movies, which already holds the latest row
+# per (title, theater) from the most recent scrape window
+_SQL_MOVIES_RECENT_THEATER = """
+    SELECT title, theater, theater_id, location, website,
+           director, year, dates, description, scraped_at,
+           poster_url, runtime, tmdb_rating, genres, 
+           cast_members, tmdb_overview, enriched_at
+    FROM mv_recent_movies
+    WHERE theater_id = %s
+    ORDER BY title
+    LIMIT %s
+"""
+
+_SQL_MOVIES_RECENT_ALL = """
+    SELECT title, theater, theater_id, location, website,
+           director, year, dates, description, scraped_at,
+           poster_url, runtime, tmdb_rating, genres, 
+           cast_members, tmdb_overview, enriched_at
+    FROM mv_recent_movies
+    ORDER BY dates ASC NULLS LAST
+    LIMIT %s
+"""
+
+_SQL_MOVIES_ALL_THEATER = """
+    SELECT title, theater, theater_id, location, website,
+           director, year, dates, description, scraped_at,
+           poster_url, runtime, tmdb_rating, genres, 
+           cast_members, tmdb_overview, enriched_at
+    FROM movies
+    WHERE theater_id = %s
+    ORDER BY scraped_at DESC
+    LIMIT %s
+"""
+
+_SQL_MOVIES_ALL = """
+    SELECT title, theater, theater_id, location, website,
+           director, year, dates, description, scraped_at,
+           poster_url, runtime, tmdb_rating, genres, 
+           cast_members, tmdb_overview, enriched_at
+    FROM movies
+    ORDER BY scraped_at DESC
+    LIMIT %s
+"""
+
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Above this many rows, /api/movies loads results with COPY ... TO STDOUT
+COPY_LIMIT_THRESHOLD = 500
+
+
+def _movies_query(theater_filter, limit: int, recent_only: bool) -> tuple:
+    """Pick the /api/movies query variant: (sql, params, prepared statement name)"""
+    if recent_only:
+        # Get only the most recent scrape's data
+        if theater_filter:
+            sql, params, stmt_name = _SQL_MOVIES_RECENT_THEATER, (theater_filter, limit), 'movies_recent_theater'
+        else:
+            sql, params, stmt_name = _SQL_MOVIES_RECENT_ALL, (limit,), 'movies_recent_all'
+    else:
+        if theater_filter:
+            sql, params, stmt_name = _SQL_MOVIES_ALL_THEATER, (theater_filter, limit), 'movies_all_theater'
+        else:
+            sql, params, stmt_name = _SQL_MOVIES_ALL, (limit,), 'movies_all'
+    
+    return sql, params, stmt_name
+
+
+def _query_movies_df(theater_filter, limit: int, recent_only: bool) -> pd.DataFrame:
+    """Run the /api/movies query variant matching the request"""
+    sql, params, stmt_name = _movies_query(theater_filter, limit, recent_only)
+    
+    if limit > COPY_LIMIT_THRESHOLD:
+        return db_copy_df(sql, params, parse_dates=['scraped_at', 'enriched_at'], conn=get_db())
+    
+    return db_select_df(sql, params, stmt_name=stmt_name, conn=get_db())
+
+
+def _build_movies_payload(theater_filter, limit: int, recent_only: bool) -> dict:
+    """Query movies for /api/movies and build the response payload"""
+    df = _query_movies_df(theater_filter, limit, recent_only)
+    
+    # Convert to list of dicts with ISO timestamps and NaN replaced by None
+    movies = _df_to_records(df)
+    
+    return {
+        'success': True,
+        'count': len(movies),
+        'movies': movies
+    }
+
+
+def _build_movies_arrow(theater_filter, limit: int, recent_only: bool) -> bytes:
+    """Query movies for /api/movies and encode them as an Arrow IPC stream"""
+    sql, params, stmt_name = _movies_query(theater_filter, limit, recent_only)
+    table = db_select_arrow(sql, params, stmt_name=stmt_name, conn=get_db())
+    
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _stream_movies_ndjson(theater_filter, limit: int, recent_only: bool):
+    """Yield /api/movies rows as NDJSON lines straight from a server-side cursor"""
+    sql, params, _ = _movies_query(theater_filter, limit, recent_only)
+    
+    for movie in db_iter(sql, params, conn=get_db()):
+        yield orjson.dumps(movie, default=OrjsonProvider._default,
+                           option=orjson.OPT_OMIT_MICROSECONDS) + b'\n'
+
+
 @app.route('/api/movies', methods=['GET'])
 def get_movies():
     """
@@ -77,103 +299,29 @@ def get_movies():
     - theater: Filter by theater_id
     - limit: Limit number of results (default 100)
     - recent: If 'true', only get movies from most recent scrape
+    - format: 'arrow' to get an Arrow IPC stream instead of JSON
+      (also selected by Accept: application/vnd.apache.arrow.stream),
+      or 'ndjson' to stream one JSON movie per line
+      (also selected by Accept: application/x-ndjson)
     """
     try:
         theater_filter = request.args.get('theater')
         limit = int(request.args.get('limit', 100))
         recent_only = request.args.get('recent', 'true').lower() == 'true'
         
-        # Build SQL query
-        if recent_only:
-            # Get only the most recent scrape's data
-            if theater_filter:
-                sql = """
-                    SELECT DISTINCT ON (title, theater_id) 
-                        title, theater, theater_id, location, website,
-                        director, year, dates, description, scraped_at,
-                        poster_url, runtime, tmdb_rating, genres, 
-                        cast_members, tmdb_overview, enriched_at
-                    FROM movies
-                    WHERE scraped_at >= (
-                        SELECT MAX(scraped_at) - INTERVAL '1 day'
-                        FROM movies
-                    )
-                    AND theater_id = %s
-                    ORDER BY title, theater_id, scraped_at DESC
-                    LIMIT %s
-                """
-                df = db_select_df(sql, (theater_filter, limit))
-            else:
-                sql = """
-                    WITH recent_movies AS (
-                        SELECT DISTINCT ON (title, theater_id) 
-                            title, theater, theater_id, location, website,
-                            director, year, dates, description, scraped_at,
-                            poster_url, runtime, tmdb_rating, genres, 
-                            cast_members, tmdb_overview, enriched_at
-                        FROM movies
-                        WHERE scraped_at >= (
-                            SELECT MAX(scraped_at) - INTERVAL '1 day'
-                            FROM movies
-                        )
-                        ORDER BY title, theater_id, scraped_at DESC
-                    )
-                    SELECT * FROM recent_movies
-                    ORDER BY dates ASC NULLS LAST
-                    LIMIT %s
-                """
-                df = db_select_df(sql, (limit,))
-        else:
-            if theater_filter:
-                sql = """
-                    SELECT title, theater, theater_id, location, website,
-                           director, year, dates, description, scraped_at,
-                           poster_url, runtime, tmdb_rating, genres, 
-                           cast_members, tmdb_overview, enriched_at
-                    FROM movies
-                    WHERE theater_id = %s
-                    ORDER BY scraped_at DESC
-                    LIMIT %s
-                """
-                df = db_select_df(sql, (theater_filter, limit))
-            else:
-                sql = """
-                    SELECT title, theater, theater_id, location, website,
-                           director, year, dates, description, scraped_at,
-                           poster_url, runtime, tmdb_rating, genres, 
-                           cast_members, tmdb_overview, enriched_at
-                    FROM movies
-                    ORDER BY scraped_at DESC
-                    LIMIT %s
-                """
-                df = db_select_df(sql, (limit,))
+        output_format = request.args.get('format')
         
-        # Convert to list of dicts and replace NaN with None
-        movies = df.to_dict('records')
+        if output_format == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE:
+            rows = _stream_movies_ndjson(theater_filter, limit, recent_only)
+            return Response(stream_with_context(rows), mimetype=NDJSON_MIMETYPE)
         
-        # Convert datetime objects to ISO format strings and handle NaN values
-        for movie in movies:
-            # Handle datetime columns
-            for datetime_col in ['scraped_at', 'enriched_at', 'created_at', 'updated_at']:
-                if datetime_col in movie and movie[datetime_col]:
-                    try:
-                        movie[datetime_col] = movie[datetime_col].isoformat()
-                    except (AttributeError, ValueError):
-                        movie[datetime_col] = None
-            
-            # Replace NaN with None for JSON serialization
-            for key, value in movie.items():
-                if isinstance(value, float) and str(value) == 'nan':
-                    movie[key] = None
-                # Handle pandas NaT (Not a Time)
-                elif value is None or (hasattr(value, '__class__') and 'NaTType' in str(value.__class__)):
-                    movie[key] = None
+        if output_format == 'arrow' or request.accept_mimetypes.best == ARROW_MIMETYPE:
+            key = ('movies', theater_filter, limit, recent_only, 'arrow')
+            return _cached_response(key, lambda: _build_movies_arrow(theater_filter, limit, recent_only),
+                                    mimetype=ARROW_MIMETYPE)
         
-        return jsonify({
-            'success': True,
-            'count': len(movies),
-            'movies': movies
-        })
+        key = ('movies', theater_filter, limit, recent_only)
+        return _cached_response(key, lambda: _build_movies_payload(theater_filter, limit, recent_only))
     
     except Exception as e:
         return jsonify({
@@ -188,45 +336,31 @@ def get_movies_by_theater():
     try:
         # Get most recent movies for each theater
         sql = """
-            SELECT DISTINCT ON (title, theater_id) 
-                title, theater, theater_id, location, website,
-                director, year, dates, description, scraped_at
-            FROM movies
-            WHERE scraped_at >= (
-                SELECT MAX(scraped_at) - INTERVAL '1 day'
-                FROM movies
-            )
-            ORDER BY title, theater_id, scraped_at DESC
+            SELECT title, theater, theater_id, location, website,
+                director, year, dates, description,
+                to_char(scraped_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS scraped_at
+            FROM mv_recent_movies
+            ORDER BY title, theater_id
         """
         
-        df = db_select_df(sql)
+        df = db_select_df(sql, conn=get_db())
         
         # Group by theater
-        theaters = {}
-        for _, row in df.iterrows():
-            theater_id = row['theater_id']
-            if theater_id not in theaters:
-                theaters[theater_id] = {
-                    'theater_id': theater_id,
-                    'theater_name': row['theater'],
-                    'location': row['location'],
-                    'website': row['website'],
-                    'movies': []
-                }
-            
-            movie = {
-                'title': row['title'],
-                'director': row.get('director'),
-                'year': row.get('year'),
-                'dates': row.get('dates'),
-                'description': row.get('description'),
-                'scraped_at': row['scraped_at'].isoformat() if row['scraped_at'] else None
-            }
-            theaters[theater_id]['movies'].append(movie)
+        theaters = []
+        movie_columns = ['title', 'director', 'year', 'dates', 'description', 'scraped_at']
+        for theater_id, group in df.groupby('theater_id', sort=False):
+            first = group.iloc[0]
+            theaters.append({
+                'theater_id': theater_id,
+                'theater_name': first['theater'],
+                'location': first['location'],
+                'website': first['website'],
+                'movies': group[movie_columns].to_dict('records')
+            })
         
         return jsonify({
             'success': True,
-            'theaters': list(theaters.values())
+            'theaters': theaters
         })
     
     except Exception as e:
@@ -236,45 +370,35 @@ def get_movies_by_theater():
         }), 500
 
 
+def _build_theaters_payload() -> dict:
+    """Query theaters with movie counts and build the /api/theaters payload"""
+    sql = """
+        SELECT 
+            theater_id AS id,
+            theater AS name,
+            location,
+            website,
+            COUNT(*) as movie_count,
+            to_char(MAX(scraped_at), 'YYYY-MM-DD"T"HH24:MI:SS') as last_updated
+        FROM mv_recent_movies
+        GROUP BY theater_id, theater, location, website
+    """
+    
+    # Postgres builds the records as JSON, sorted inside json_agg; no DataFrame round-trip
+    theaters = db_select_json(sql, order_by='name', conn=get_db())
+    
+    return {
+        'success': True,
+        'count': len(theaters),
+        'theaters': theaters
+    }
+
+
 @app.route('/api/theaters', methods=['GET'])
 def get_theaters():
     """Get list of all theaters with movie counts"""
     try:
-        sql = """
-            SELECT 
-                theater_id,
-                theater,
-                location,
-                website,
-                COUNT(*) as movie_count,
-                MAX(scraped_at) as last_updated
-            FROM movies
-            WHERE scraped_at >= (
-                SELECT MAX(scraped_at) - INTERVAL '1 day'
-                FROM movies
-            )
-            GROUP BY theater_id, theater, location, website
-            ORDER BY theater
-        """
-        
-        df = db_select_df(sql)
-        
-        theaters = []
-        for _, row in df.iterrows():
-            theaters.append({
-                'id': row['theater_id'],
-                'name': row['theater'],
-                'location': row['location'],
-                'website': row['website'],
-                'movie_count': int(row['movie_count']),
-                'last_updated': row['last_updated'].isoformat() if row['last_updated'] else None
-            })
-        
-        return jsonify({
-            'success': True,
-            'count': len(theaters),
-            'theaters': theaters
-        })
+        return _cached_response(('theaters',), _build_theaters_payload)
     
     except Exception as e:
         return jsonify({
@@ -299,35 +423,37 @@ def search_movies():
                 'error': 'Search query must be at least 2 characters'
             }), 400
         
+        # ILIKE is served by the pg_trgm GIN index; best matches first
         sql = """
-            SELECT DISTINCT ON (title, theater_id) 
+            SELECT
                 title, theater, theater_id, location, website,
-                director, year, dates, description, scraped_at,
-                poster_url, runtime, tmdb_rating, genres, 
-                cast_members, tmdb_overview, enriched_at
-            FROM movies
-            WHERE LOWER(title) LIKE LOWER(%s)
-                AND scraped_at >= (
-                    SELECT MAX(scraped_at) - INTERVAL '7 days'
-                    FROM movies
-                )
-            ORDER BY title, theater_id, scraped_at DESC
+                director, year, dates, description,
+                to_char(scraped_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS scraped_at,
+                poster_url, runtime, tmdb_rating, genres,
+                cast_members, tmdb_overview,
+                to_char(enriched_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS enriched_at
+            FROM (
+                SELECT DISTINCT ON (title, theater_id) 
+                    title, theater, theater_id, location, website,
+                    director, year, dates, description, scraped_at,
+                    poster_url, runtime, tmdb_rating, genres, 
+                    cast_members, tmdb_overview, enriched_at
+                FROM movies
+                WHERE title ILIKE %s
+                    AND scraped_at >= (
+                        SELECT MAX(scraped_at) - INTERVAL '7 days'
+                        FROM movies
+                    )
+                ORDER BY title, theater_id, scraped_at DESC
+            ) matches
+            ORDER BY similarity(title, %s) DESC, matches.scraped_at DESC
             LIMIT 50
         """
         
         search_pattern = f'%{query}%'
-        df = db_select_df(sql, (search_pattern,))
+        df = db_select_df(sql, (search_pattern, query), conn=get_db())
         
-        movies = df.to_dict('records')
-        
-        # Convert datetime objects to ISO format strings and handle NaN values
-        for movie in movies:
-            if 'scraped_at' in movie and movie['scraped_at']:
-                movie['scraped_at'] = movie['scraped_at'].isoformat()
-            # Replace NaN with None for JSON serialization
-            for key, value in movie.items():
-                if isinstance(value, float) and str(value) == 'nan':
-                    movie[key] = None
+        movies = _df_to_records(df)
         
         return jsonify({
             'success': True,
@@ -343,38 +469,63 @@ def search_movies():
         }), 500
 
 
+def _build_stats_payload() -> dict:
+    """Query database statistics and build the /api/stats payload"""
+    # Total movies, recent movies and last scrape time in one round-trip
+    sql = """
+        SELECT
+            (SELECT COUNT(*) FROM movies) AS total_movies,
+            (SELECT COUNT(*) FROM mv_recent_movies) AS recent_movies,
+            (SELECT MAX(scraped_at) FROM movies) AS last_scrape
+    """
+    stats = db_select_records(sql, conn=get_db())[0]
+    
+    return {
+        'success': True,
+        'stats': {
+            'total_movies_all_time': stats.total_movies,
+            'current_movies': stats.recent_movies,
+            'last_scrape': stats.last_scrape
+        }
+    }
+
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get statistics about the database"""
     try:
-        # Total movies
-        total_sql = "SELECT COUNT(*) FROM movies"
-        total_result = db_select(total_sql)
-        total_movies = total_result[0][0] if total_result else 0
-        
-        # Recent movies
-        recent_sql = """
-            SELECT COUNT(*) FROM movies 
-            WHERE scraped_at >= (
-                SELECT MAX(scraped_at) - INTERVAL '1 day'
-                FROM movies
-            )
-        """
-        recent_result = db_select(recent_sql)
-        recent_movies = recent_result[0][0] if recent_result else 0
-        
-        # Last scrape time
-        last_scrape_sql = "SELECT MAX(scraped_at) FROM movies"
-        last_scrape_result = db_select(last_scrape_sql)
-        last_scrape = last_scrape_result[0][0].isoformat() if last_scrape_result and last_scrape_result[0][0] else None
+        return _cached_response(('stats',), _build_stats_payload)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/admin/refresh-view', methods=['POST'])
+def refresh_view():
+    """
+    Refresh the mv_recent_movies materialized view
+    Requires ADMIN_SECRET in X-Admin-Key header
+    """
+    # Check authentication
+    admin_key = request.headers.get('X-Admin-Key')
+    if not admin_key or admin_key != ADMIN_SECRET:
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        conn = get_db()
+        refresh_recent_movies(conn=conn)
+        conn.commit()
+        clear_response_cache()
         
         return jsonify({
             'success': True,
-            'stats': {
-                'total_movies_all_time': total_movies,
-                'current_movies': recent_movies,
-                'last_scrape': last_scrape
-            }
+            'message': 'Refreshed mv_recent_movies'
         })
     
     except Exception as e:
@@ -410,6 +561,9 @@ def trigger_enrichment():
         enricher = TMDBEnricher()
         enriched_count = enricher.enrich_all_unenriched(limit=limit)
         
+        # Enrichment changed movie rows, so cached responses are stale
+        clear_response_cache()
+        
         return jsonify({
             'success': True,
             'enriched': enriched_count,
@@ -424,13 +578,6 @@ def trigger_enrichment():
 
 
 if __name__ == '__main__':
-    # Ensure database tables exist
-    try:
-        create_tables()
-        print("✅ Database tables verified")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not verify database tables: {e}")
-    
     print("\n" + "="*50)
     print("Indieflix API Server Starting")
     print("="*50)
@@ -444,6 +591,7 @@ if __name__ == '__main__':
     print("")
     print("Admin Endpoints (requires X-Admin-Key header):")
     print("  POST /admin/trigger-enrichment  - Enrich with TMDB data")
+    print("  POST /admin/refresh-view        - Refresh recent-movies view")
     print("")
     print("💡 To run scrapers: Use Render Shell or SSH")
     print("   python3 deng/ingestion/metrograph_v2.py")
@@ -5,8 +5,12 @@ Enriches movie data with posters and metadata from The Movie Database (TMDB)
 
 import os
 import sys
-import requests
+import asyncio
+import httpx
 import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 from pathlib import Path
@@ -14,7 +18,10 @@ from dotenv import load_dotenv
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
-from storage.postgres import db_select, update_db, create_tables
+from storage.postgres import (
+    db_select, db_execute, update_db, create_tables, bulk_update_movies, refresh_recent_movies,
+    ENRICHMENT_COLUMNS
+)
 
 # Load environment variables
 env_path = Path(__file__).parent.parent.parent / '.env'
@@ -34,47 +41,97 @@ class TMDBEnricher:
         self.poster_size = 'w342'  # Smaller size for faster loading
         self.backdrop_size = 'w780'
         
-        # Rate limiting: 40 requests per 10 seconds
-        self.request_times = []
+        # Rate limiting: 40 requests per 10 seconds (sliding window of send times)
         self.max_requests_per_window = 40
         self.window_seconds = 10
+        self.request_times = deque(maxlen=self.max_requests_per_window)
+        self._rate_lock = None
+        
+        # Movies are enriched concurrently on one event loop; the rate limiter paces them
+        self.max_concurrency = 40
+        
+        # Enrichment results are written to the database in batches
+        self.update_batch_size = 50
+        
+        # Retry throttled / transient failures with exponential backoff
+        self.max_retries = 3
+        self.retry_backoff = 0.3
+        self.retry_statuses = {429, 500, 502, 503, 504}
+        
+        # HTTP/2 keep-alive client, opened per event loop by _client_session()
+        self.client: Optional[httpx.AsyncClient] = None
+        
+        # movie/{id}?append_to_response=credits results for the current session, so a
+        # candidate hydrated during director verification isn't fetched twice
+        self._details_cache: Dict[int, Dict] = {}
     
-    def _wait_if_needed(self):
-        """Implement rate limiting"""
-        now = time.time()
-        
-        # Remove requests older than the window
-        self.request_times = [t for t in self.request_times if now - t < self.window_seconds]
-        
-        # If we're at the limit, wait
-        if len(self.request_times) >= self.max_requests_per_window:
-            sleep_time = self.window_seconds - (now - self.request_times[0])
-            if sleep_time > 0:
-                print(f"  ⏳ Rate limit reached, waiting {sleep_time:.1f}s...")
-                time.sleep(sleep_time)
-                self.request_times = []
-        
-        self.request_times.append(time.time())
+    @asynccontextmanager
+    async def _client_session(self):
+        """Open the shared AsyncClient (and rate-limit lock) for the running event loop"""
+        self._rate_lock = asyncio.Lock()
+        self._details_cache = {}
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=16),
+            timeout=10.0,
+            headers={'Accept-Encoding': 'gzip'},
+        ) as client:
+            self.client = client
+            try:
+                yield client
+            finally:
+                self.client = None
     
-    def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+    async def _wait_if_needed(self):
+        """Implement rate limiting (safe across concurrent tasks)"""
+        async with self._rate_lock:
+            now = time.time()
+            
+            # Expire requests older than the window from the left (oldest first)
+            while self.request_times and now - self.request_times[0] >= self.window_seconds:
+                self.request_times.popleft()
+            
+            # If we're at the limit, wait until the oldest request leaves the window
+            if len(self.request_times) >= self.max_requests_per_window:
+                sleep_time = self.window_seconds - (now - self.request_times[0])
+                if sleep_time > 0:
+                    print(f"  ⏳ Rate limit reached, waiting {sleep_time:.1f}s...")
+                    await asyncio.sleep(sleep_time)
+                self.request_times.popleft()
+            
+            self.request_times.append(time.time())
+    
+    async def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make API request with rate limiting"""
-        self._wait_if_needed()
-        
         if params is None:
             params = {}
         params['api_key'] = self.api_key
         
         url = f"{self.base_url}/{endpoint}"
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"  ⚠️  API request failed: {e}")
-            return None
+        for attempt in range(self.max_retries + 1):
+            await self._wait_if_needed()
+            
+            try:
+                response = await self.client.get(url, params=params)
+                if response.status_code in self.retry_statuses and attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except httpx.TransportError as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                    continue
+                print(f"  ⚠️  API request failed: {e}")
+                return None
+            except Exception as e:
+                print(f"  ⚠️  API request failed: {e}")
+                return None
+        
+        return None
     
-    def search_movie(self, title: str, year: Optional[int] = None, 
+    async def search_movie(self, title: str, year: Optional[int] = None, 
                      director: Optional[str] = None) -> Optional[Dict]:
         """
         Search for movie on TMDB using multiple strategies
@@ -90,7 +147,7 @@ class TMDBEnricher:
         # Strategy 1: Search with title and year (most accurate)
         if year:
             params = {'query': title, 'year': year}
-            data = self._make_request('search/movie', params)
+            data = await self._make_request('search/movie', params)
             
             if data and data.get('results'):
                 result = data['results'][0]
@@ -101,13 +158,13 @@ class TMDBEnricher:
         # Strategy 2: Search with title and verify director
         if director:
             params = {'query': title}
-            data = self._make_request('search/movie', params)
+            data = await self._make_request('search/movie', params)
             
             if data and data.get('results'):
                 for result in data['results'][:3]:  # Check top 3 results
-                    # Get movie details to check director
-                    movie_id = result['id']
-                    credits = self._make_request(f'movie/{movie_id}/credits')
+                    # Get movie details with credits appended to check director
+                    details = await self.get_movie_details(result['id'])
+                    credits = details['credits'] if details else None
                     
                     if credits and credits.get('crew'):
                         directors = [
@@ -122,7 +179,7 @@ class TMDBEnricher:
         
         # Strategy 3: Search by title only (fallback)
         params = {'query': title}
-        data = self._make_request('search/movie', params)
+        data = await self._make_request('search/movie', params)
         
         if data and data.get('results'):
             # Return first result if it has good popularity
@@ -132,20 +189,22 @@ class TMDBEnricher:
         
         return None
     
-    def get_movie_details(self, tmdb_id: int) -> Optional[Dict]:
-        """Get full movie details including credits"""
-        movie = self._make_request(f'movie/{tmdb_id}')
+    async def get_movie_details(self, tmdb_id: int) -> Optional[Dict]:
+        """Get full movie details including credits (one request via append_to_response)"""
+        if tmdb_id in self._details_cache:
+            return self._details_cache[tmdb_id]
+        
+        movie = await self._make_request(f'movie/{tmdb_id}', {'append_to_response': 'credits'})
         
         if not movie:
             return None
         
-        # Get credits for cast
-        credits = self._make_request(f'movie/{tmdb_id}/credits')
-        
-        return {
+        details = {
             'movie': movie,
-            'credits': credits
+            'credits': movie.get('credits', {})
         }
+        self._details_cache[tmdb_id] = details
+        return details
     
     def format_runtime(self, minutes: int) -> str:
         """Format runtime in minutes to human readable string"""
@@ -159,35 +218,34 @@ class TMDBEnricher:
             return f"{hours}h {mins}m" if mins > 0 else f"{hours}h"
         return f"{mins}m"
     
-    def enrich_movie(self, movie_id: int, title: str, year: Optional[int] = None,
-                     director: Optional[str] = None) -> bool:
+    async def fetch_enrichment(self, title: str, year: Optional[int] = None,
+                         director: Optional[str] = None) -> Optional[Dict]:
         """
-        Enrich a single movie with TMDB data
+        Look up a movie on TMDB and build its enrichment columns
         
         Args:
-            movie_id: Database movie ID
             title: Movie title
             year: Release year (optional)
             director: Director name (optional)
         
         Returns:
-            True if enrichment successful, False otherwise
+            Dict of movies column:value pairs, or None if no match was found
         """
         # Search for movie
-        search_result = self.search_movie(title, year, director)
+        search_result = await self.search_movie(title, year, director)
         
         if not search_result:
             print(f"  ❌ No TMDB match found for: {title}")
-            return False
+            return None
         
         tmdb_id = search_result['id']
         
         # Get full details
-        details = self.get_movie_details(tmdb_id)
+        details = await self.get_movie_details(tmdb_id)
         
         if not details:
             print(f"  ❌ Could not fetch details for TMDB ID {tmdb_id}")
-            return False
+            return None
         
         movie_data = details['movie']
         credits_data = details.get('credits', {})
@@ -211,9 +269,10 @@ class TMDBEnricher:
         
         overview = movie_data.get('overview')
         
-        # Update database
-        update_data = {
+        return {
             'tmdb_id': tmdb_id,
+            'poster_path': poster_path,
+            'backdrop_path': backdrop_path,
             'poster_url': poster_url,
             'backdrop_url': backdrop_url,
             'runtime': runtime,
@@ -223,15 +282,147 @@ class TMDBEnricher:
             'tmdb_overview': overview,
             'enriched_at': datetime.now()
         }
+    
+    def enrich_movie(self, movie_id: int, title: str, year: Optional[int] = None,
+                     director: Optional[str] = None) -> bool:
+        """
+        Enrich a single movie with TMDB data
+        
+        Args:
+            movie_id: Database movie ID
+            title: Movie title
+            year: Release year (optional)
+            director: Director name (optional)
+        
+        Returns:
+            True if enrichment successful, False otherwise
+        """
+        return asyncio.run(self._enrich_movie_session(movie_id, title, year, director))
+    
+    async def _enrich_movie_session(self, movie_id: int, title: str, year: Optional[int],
+                                    director: Optional[str]) -> bool:
+        """Run enrich_movie_async inside its own client session"""
+        async with self._client_session():
+            return await self.enrich_movie_async(movie_id, title, year, director)
+    
+    async def enrich_movie_async(self, movie_id: int, title: str, year: Optional[int] = None,
+                                 director: Optional[str] = None) -> bool:
+        """
+        Enrich a single movie with TMDB data (requires an open client session)
+        
+        Returns:
+            True if enrichment successful, False otherwise
+        """
+        update_data = await self.fetch_enrichment(title, year, director)
+        
+        if not update_data:
+            return False
         
         try:
-            update_db('movies', update_data, 'id = %s', (movie_id,))
+            await asyncio.to_thread(update_db, 'movies', update_data, 'id = %s', (movie_id,))
+            await asyncio.to_thread(self._refresh_view)
             print(f"  ✓ Enriched: {title}")
             return True
         except Exception as e:
             print(f"  ❌ Database update failed: {e}")
             return False
     
+    def _refresh_view(self) -> None:
+        """Refresh mv_recent_movies so the API sees new enrichment data"""
+        try:
+            refresh_recent_movies()
+        except Exception as e:
+            print(f"  ⚠️  Could not refresh recent movies view: {e}")
+    
+    def _flush_updates(self, rows: List[tuple]) -> int:
+        """Write a batch of enrichment rows, returning how many were saved"""
+        if not rows:
+            return 0
+        
+        try:
+            bulk_update_movies(rows)
+            print(f"  💾 Saved {len(rows)} enriched movies")
+            return len(rows)
+        except Exception as e:
+            print(f"  ❌ Database update failed: {e}")
+            return 0
+    
+    async def _bounded(self, sem: asyncio.Semaphore, movie: tuple) -> tuple:
+        """Fetch enrichment for one (id, title, year, director) row under the semaphore"""
+        movie_id, title, year, director = movie
+        async with sem:
+            try:
+                return movie_id, title, await self.fetch_enrichment(title, year, director)
+            except Exception as e:
+                return movie_id, title, e
+    
+    async def _run_batch(self, movies: List[tuple], action: str) -> int:
+        """Enrich rows on one event loop, flushing results as they complete"""
+        enriched_count = 0
+        pending = []
+        sem = asyncio.Semaphore(self.max_concurrency)
+        
+        async with self._client_session():
+            tasks = [self._bounded(sem, movie) for movie in movies]
+            
+            for idx, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                movie_id, title, update_data = await next_done
+                print(f"[{idx}/{len(movies)}] {action}: {title}")
+                
+                if isinstance(update_data, Exception):
+                    print(f"  ❌ Enrichment failed for {title}: {update_data}")
+                    continue
+                
+                if not update_data:
+                    continue
+                
+                pending.append((movie_id,) + tuple(update_data[col] for col in ENRICHMENT_COLUMNS))
+                print(f"  ✓ Matched: {title}")
+                
+                if len(pending) >= self.update_batch_size:
+                    enriched_count += await asyncio.to_thread(self._flush_updates, pending)
+                    pending = []
+        
+        enriched_count += await asyncio.to_thread(self._flush_updates, pending)
+        
+        if enriched_count:
+            await asyncio.to_thread(self._refresh_view)
+        
+        return enriched_count
+    
+    def _enrich_batch(self, movies: List[tuple], action: str = 'Processing') -> int:
+        """
+        Enrich (id, title, year, director) rows concurrently
+        
+        TMDB lookups run as asyncio tasks over a single HTTP/2 client, bounded
+        by max_concurrency; results are buffered and written with one batched
+        UPDATE per update_batch_size movies.
+        
+        Returns:
+            Number of movies enriched
+        """
+        return asyncio.run(self._run_batch(movies, action))
+    
+    def rebuild_image_urls(self) -> None:
+        """
+        Rebuild poster/backdrop URLs from the stored TMDB paths
+        
+        Use after changing TMDB_BASE_IMAGE_URL or the poster/backdrop sizes.
+        """
+        sql = """
+            UPDATE movies SET
+                poster_url = %s || poster_path,
+                backdrop_url = %s || backdrop_path
+            WHERE poster_path IS NOT NULL OR backdrop_path IS NOT NULL
+        """
+        db_execute(sql, (
+            f"{self.image_base_url}{self.poster_size}",
+            f"{self.image_base_url}{self.backdrop_size}",
+        ))
+        
+        self._refresh_view()
+        print("✅ Rebuilt poster/backdrop URLs from stored TMDB paths")
+    
     def enrich_all_unenriched(self, limit: Optional[int] = None) -> int:
         """
         Enrich all movies that haven't been enriched yet
@@ -265,16 +456,7 @@ class TMDBEnricher:
         
         print(f"📊 Found {len(movies)} unenriched movies\n")
         
-        enriched_count = 0
-        
-        for idx, (movie_id, title, year, director) in enumerate(movies, 1):
-            print(f"[{idx}/{len(movies)}] Processing: {title}")
-            
-            if self.enrich_movie(movie_id, title, year, director):
-                enriched_count += 1
-            
-            # Small delay between movies
-            time.sleep(0.2)
+        enriched_count = self._enrich_batch(movies)
         
         print(f"\n{'='*60}")
         print(f"✅ ENRICHMENT COMPLETE")
@@ -315,15 +497,7 @@ class TMDBEnricher:
         
         print(f"📊 Found {len(movies)} unenriched movies\n")
         
-        enriched_count = 0
-        
-        for idx, (movie_id, title, year, director) in enumerate(movies, 1):
-            print(f"[{idx}/{len(movies)}] Processing: {title}")
-            
-            if self.enrich_movie(movie_id, title, year, director):
-                enriched_count += 1
-            
-            time.sleep(0.2)
+        enriched_count = self._enrich_batch(movies)
         
         print(f"\n{'='*60}")
         print(f"✅ ENRICHMENT COMPLETE")
@@ -367,15 +541,7 @@ class TMDBEnricher:
         
         print(f"📊 Found {len(movies)} movies with stale data\n")
         
-        enriched_count = 0
-        
-        for idx, (movie_id, title, year, director) in enumerate(movies, 1):
-            print(f"[{idx}/{len(movies)}] Re-enriching: {title}")
-            
-            if self.enrich_movie(movie_id, title, year, director):
-                enriched_count += 1
-            
-            time.sleep(0.2)
+        enriched_count = self._enrich_batch(movies, action='Re-enriching')
         
         print(f"\n{'='*60}")
         print(f"✅ RE-ENRICHMENT COMPLETE")
@@ -385,6 +551,21 @@ class TMDBEnricher:
         return enriched_count
 
 
+@lru_cache(maxsize=1)
+def get_enricher() -> TMDBEnricher:
+    """
+    Shared TMDBEnricher for the current process
+    
+    Reusing one instance keeps its rate-limit window across callers, so the
+    scrapers and the daily pipeline don't each start a fresh budget. Raises
+    ValueError (and caches nothing) if TMDB_API_KEY is missing.
+    
+    Example:
+        get_enricher().enrich_recent(hours=1)
+    """
+    return TMDBEnricher()
+
+
 def main():
     """Run enricher as standalone script"""
     import argparse
@@ -398,6 +579,8 @@ def main():
                        help='Re-enrich movies older than N days')
     parser.add_argument('--limit', type=int,
                        help='Limit number of movies to process')
+    parser.add_argument('--rebuild-urls', action='store_true',
+                       help='Rebuild poster/backdrop URLs from stored TMDB paths')
     
     args = parser.parse_args()
     
@@ -409,14 +592,16 @@ def main():
     
     # Create enricher
     try:
-        enricher = TMDBEnricher()
+        enricher = get_enricher()
     except ValueError as e:
         print(f"❌ {e}")
         print("Please set TMDB_API_KEY in your .env file")
         return
     
     # Run appropriate enrichment
-    if args.recent:
+    if args.rebuild_urls:
+        enricher.rebuild_image_urls()
+    elif args.recent:
         enricher.enrich_recent(hours=args.recent)
     elif args.all:
         enricher.enrich_all_unenriched(limit=args.limit)
@@ -4,21 +4,54 @@ Scrapes movie schedules from IFC Center in NYC
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
+from itertools import islice
 import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
-from storage.postgres import insert_many_db, create_tables
+from storage.postgres import (
+    insert_many_db, create_tables, refresh_recent_movies, movie_rows, MOVIES_SCRAPE_COLUMNS, MOVIES_UPSERT
+)
+
+
+def _class_selector(tags: List[str], words: List[str]) -> str:
+    """
+    Build a CSS selector matching any of tags whose class contains any of words
+    
+    Example:
+        _class_selector(['p'], ['date', 'time'])
+        -> 'p[class*="date" i], p[class*="time" i]'
+    """
+    return ', '.join(f'{tag}[class*="{word}" i]' for tag in tags for word in words)
 
 
 class IFCCenterScraper:
     """Scraper for IFC Center"""
     
+    # Patterns used for every page / film item, compiled once
+    _RE_FILM_CLASS = re.compile(r'film|movie|screening', re.I)
+    _RE_DIRECTED_BY = re.compile(r'^(directed by|by|dir\.?)\s*', re.I)
+    _RE_YEAR = re.compile(r'\b(19|20)\d{2}\b')
+    # Navigation/header text that shows up as "titles" in generic matches
+    _SKIP_RE = re.compile(r'\b(home|about|contact|menu|search|login|cart)\b', re.I)
+    
+    # Title headings in priority order; a selector group would return whichever
+    # comes first in the document (e.g. a page-level h1 ahead of the film's h2)
+    _TITLE_TAGS = ('h2', 'h3', 'h4', 'h1')
+    
+    # Per-field CSS selectors - one subtree walk per field instead of one per tag
+    _SEL_DIRECTOR = _class_selector(['p', 'div', 'span'], ['director', 'filmmaker', 'by'])
+    _SEL_DATE = _class_selector(['p', 'div', 'span', 'time'],
+                                ['date', 'time', 'showing', 'screening', 'schedule'])
+    _SEL_DESC = _class_selector(['p', 'div'], ['description', 'synopsis', 'summary'])
+    
     def __init__(self):
         self.name = 'IFC Center'
         self.url = 'https://www.ifccenter.com/films/'
@@ -27,14 +60,28 @@ class IFCCenterScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        
+        # Keep-alive session with retries for transient server errors
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=20, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.session.close()
     
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """Fetch and parse a web page"""
         try:
             print(f"Fetching {url}...")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, 'lxml')
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
@@ -43,14 +90,21 @@ class IFCCenterScraper:
         """Clean and normalize text"""
         if not text:
             return ""
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return ' '.join(text.split())
     
     def extract_year(self, text: str) -> Optional[int]:
         """Extract year from text"""
-        match = re.search(r'\b(19|20)\d{2}\b', text)
+        match = self._RE_YEAR.search(text)
         return int(match.group()) if match else None
     
+    def _looks_like_film(self, item) -> bool:
+        """Cheap pre-filter for generic matches: needs a heading, a link and some text"""
+        return bool(
+            item.find(['h1', 'h2', 'h3', 'h4'])
+            and item.find('a', href=True)
+            and len(item.get_text(strip=True)) > 40
+        )
+    
     def scrape(self) -> List[Dict]:
         """Scrape IFC Center schedule"""
         print(f"\n{'='*50}")
@@ -64,11 +118,15 @@ class IFCCenterScraper:
             return []
         
         movies = []
+        # Titles already kept: nested film-* divs can yield the same heading twice,
+        # and rows sharing the run's scraped_at would clash on UNIQUE(title, theater, scraped_at)
+        seen = set()
+        scraped_at = datetime.now().isoformat()
         
         # Try multiple potential selectors
         selectors = [
-            ('div', {'class': re.compile('film|movie|screening', re.I)}),
-            ('article', {'class': re.compile('film|movie|screening', re.I)}),
+            ('div', {'class': self._RE_FILM_CLASS}),
+            ('article', {'class': self._RE_FILM_CLASS}),
             ('div', {'class': 'film-item'}),
             ('div', {'class': 'movie-listing'}),
         ]
@@ -82,14 +140,17 @@ class IFCCenterScraper:
         
         if not film_items:
             print("No film items found, trying generic approach...")
-            # Fallback: look for any divs/articles with links and titles
-            film_items = soup.find_all(['div', 'article'])[:20]
+            # Fallback: look for any divs/articles with links and titles,
+            # stopping as soon as enough plausible film items are found
+            candidates = (item for item in soup.find_all(['div', 'article'])
+                          if self._looks_like_film(item))
+            film_items = list(islice(candidates, 15))
         
         for item in film_items[:15]:
             try:
                 # Try to find title
                 title = None
-                for tag in ['h2', 'h3', 'h4', 'h1']:
+                for tag in self._TITLE_TAGS:
                     title_elem = item.find(tag)
                     if title_elem:
                         title = self.clean_text(title_elem.get_text())
@@ -97,38 +158,42 @@ class IFCCenterScraper:
                 
                 # Try link text if no header found
                 if not title:
-                    link = item.find('a')
-                    if link and link.get_text():
-                        title = self.clean_text(link.get_text())
+                    link = item.select_one('a')
+                    link_text = link.get_text() if link else None
+                    if link_text:
+                        title = self.clean_text(link_text)
                 
                 # Skip if title is too short or invalid
                 if not title or len(title) < 3:
                     continue
                 
                 # Skip common navigation/header text
-                skip_terms = ['home', 'about', 'contact', 'menu', 'search', 'login', 'cart']
-                if any(term in title.lower() for term in skip_terms):
+                if self._SKIP_RE.search(title):
                     continue
                 
+                if title in seen:
+                    continue
+                seen.add(title)
+                
                 movie = {
                     'title': title,
                     'theater': self.name,
                     'theater_id': 'ifc_center',
                     'location': self.location,
                     'website': self.website,
-                    'scraped_at': datetime.now().isoformat()
+                    'scraped_at': scraped_at
                 }
                 
                 # Try to extract director
-                director_elem = item.find(['p', 'div', 'span'], class_=re.compile('director|filmmaker|by', re.I))
+                director_elem = item.select_one(self._SEL_DIRECTOR)
                 if director_elem:
                     director_text = self.clean_text(director_elem.get_text())
                     # Clean up "Directed by" prefix
-                    director_text = re.sub(r'^(directed by|by|dir\.?)\s*', '', director_text, flags=re.I)
+                    director_text = self._RE_DIRECTED_BY.sub('', director_text)
                     movie['director'] = director_text
                 
                 # Try to extract dates/showtimes
-                date_elem = item.find(['p', 'div', 'span', 'time'], class_=re.compile('date|time|showing|screening|schedule', re.I))
+                date_elem = item.select_one(self._SEL_DATE)
                 if date_elem:
                     movie['dates'] = self.clean_text(date_elem.get_text())
                 else:
@@ -140,7 +205,7 @@ class IFCCenterScraper:
                     movie['year'] = year
                 
                 # Try to extract description
-                desc_elem = item.find(['p', 'div'], class_=re.compile('description|synopsis|summary', re.I))
+                desc_elem = item.select_one(self._SEL_DESC)
                 if desc_elem:
                     desc = self.clean_text(desc_elem.get_text())
                     if len(desc) > 20:  # Only include if substantial
@@ -166,28 +231,10 @@ def save_to_db(movies: List[Dict]) -> None:
         print("No movies to save")
         return
     
-    # Prepare data for bulk insert
-    columns = ['title', 'theater', 'theater_id', 'location', 'website', 
-               'director', 'year', 'dates', 'description', 'scraped_at']
-    
-    values = []
-    for movie in movies:
-        values.append((
-            movie.get('title'),
-            movie.get('theater'),
-            movie.get('theater_id'),
-            movie.get('location'),
-            movie.get('website'),
-            movie.get('director'),
-            movie.get('year'),
-            movie.get('dates'),
-            movie.get('description'),
-            movie.get('scraped_at')
-        ))
-    
     try:
-        insert_many_db('movies', columns, values)
+        insert_many_db('movies', MOVIES_SCRAPE_COLUMNS, movie_rows(movies), on_conflict=MOVIES_UPSERT)
         print(f"\n💾 Saved {len(movies)} movies to database")
+        refresh_recent_movies()
     except Exception as e:
         print(f"\n❌ Error saving to database: {e}")
 
@@ -200,8 +247,8 @@ def main():
     except Exception as e:
         print(f"Warning: Could not verify tables: {e}")
     
-    scraper = IFCCenterScraper()
-    movies = scraper.scrape()
+    with IFCCenterScraper() as scraper:
+        movies = scraper.scrape()
     
     print("\nMovies found:")
     for i, movie in enumerate(movies, 1):
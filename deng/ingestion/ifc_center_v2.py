@@ -4,24 +4,74 @@ IFC Center Scraper V2
 Scrapes movie schedules from IFC Center's homepage and detail pages
 """
 
+import asyncio
+import aiohttp
+import diskcache
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime, timedelta
 import re
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 from typing import List, Dict, Optional
 
-# Add utils to path
+# Add utils to path (storage.postgres is imported lazily, only once there is data to save)
 sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
-from storage.postgres import insert_many_db, create_tables
+
+
+# Patterns used on every page, compiled once
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_DIGITS_RE = re.compile(r'(\d+)')
+_DAY_RE = re.compile(r'(\w+)\s+(\d+)')
+
+# Film detail pages rarely change during a run, so parsed details are kept on disk
+DETAILS_CACHE_DIR = Path(__file__).parent / '.cache' / 'ifc_details'
+DETAILS_CACHE_TTL = 7 * 24 * 3600  # 7 days
+
+# Only the showtimes widget matters on the homepage - skip building the rest of the DOM
+HOMEPAGE_STRAINER = SoupStrainer(id='js-showtimes-widget')
+
+
+class _AsyncRateLimiter:
+    """
+    Space request starts at least 1/rate seconds apart across all tasks
+    
+    The last send time is shared under an asyncio.Lock, so concurrent
+    fetches queue for their slot instead of each sleeping after its
+    response. Time already spent waiting on the network counts against
+    the interval.
+    """
+    
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self.last_send = 0.0
+        self.lock = asyncio.Lock()
+    
+    async def wait(self) -> None:
+        async with self.lock:
+            delay = self.last_send + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last_send = time.monotonic()
 
 
 class IFCCenterScraperV2:
     """Scraper for IFC Center"""
     
-    def __init__(self):
+    # CSS selectors for the homepage showtimes widget
+    _SEL_WIDGET = '#js-showtimes-widget'
+    _SEL_SCHEDULES = '.daily-schedule:not(.show-coming-soon)'
+    _SEL_DATE_HEADER = 'h3'
+    _SEL_FILM_ITEMS = 'li'
+    _SEL_TITLE_LINK = 'h3 a'
+    _SEL_SHOWTIMES = 'ul.times a'
+    
+    def __init__(self, refresh_cache: bool = False):
         self.name = 'IFC Center'
         self.theater_id = 'ifc_center'
         self.base_url = 'https://www.ifccenter.com'
@@ -31,26 +81,63 @@ class IFCCenterScraperV2:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        
+        # Keep-alive session: the homepage and every /film/ detail page share one connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=20, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Film detail pages are fetched concurrently, capped at this many in flight
+        # and started no faster than detail_rate per second
+        self.detail_concurrency = 5
+        self.detail_rate = 10.0
+        
+        # Persistent {film_url: details} cache shared across daily runs
+        self.cache = diskcache.Cache(str(DETAILS_CACHE_DIR))
+        if refresh_cache:
+            self.cache.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.session.close()
+        self.cache.close()
     
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a web page"""
+    def fetch_page(self, url: str, parse_only: Optional[SoupStrainer] = None) -> Optional[BeautifulSoup]:
+        """
+        Fetch and parse a web page
+        
+        Args:
+            url: Page URL
+            parse_only: Optional SoupStrainer limiting which part of the page is parsed
+        """
         try:
             print(f"  Fetching {url}...")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, 'lxml', parse_only=parse_only)
         except Exception as e:
             print(f"  ❌ Error fetching {url}: {e}")
             return None
     
+    def _norm(self, url: str) -> str:
+        """Canonical form of a film URL (lowercase host, no query/fragment/trailing slash)"""
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+    
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return ' '.join(text.split())
     
-    def parse_day_to_date(self, day_str: str, year: int = 2025) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def parse_day_to_date(day_str: str, year: int = 2025) -> Optional[str]:
         """
         Parse day string like 'Mon Oct 6' to YYYY-MM-DD
         
@@ -59,11 +146,11 @@ class IFCCenterScraperV2:
             year: Year to use (defaults to 2025)
         
         Returns:
-            Date in YYYY-MM-DD format
+            Date in YYYY-MM-DD format (memoized - the same day strings repeat)
         """
         try:
             # Extract "Oct 6" from "Mon Oct 6"
-            match = re.search(r'(\w+)\s+(\d+)', day_str)
+            match = _DAY_RE.search(day_str)
             if not match:
                 return None
             
@@ -81,72 +168,156 @@ class IFCCenterScraperV2:
     
     def extract_movie_details(self, film_url: str) -> Dict:
         """
-        Fetch and parse movie detail page
+        Fetch and parse movie detail page (served from the disk cache when fresh)
         
         Returns:
             Dict with director, year, runtime, cast, description
         """
-        details = {}
+        film_url = self._norm(film_url)
+        cached = self.cache.get(film_url)
+        if cached is not None:
+            return cached
         
         soup = self.fetch_page(film_url)
         if not soup:
-            return details
-        
-        # Find film details list
-        details_list = soup.find('ul', class_='film-details')
-        if details_list:
-            for li in details_list.find_all('li'):
-                strong = li.find('strong')
-                if not strong:
-                    continue
-                
-                label = self.clean_text(strong.get_text()).lower()
-                # Get text after the <strong> tag
-                value = self.clean_text(li.get_text().replace(strong.get_text(), ''))
-                
-                if 'director' in label:
-                    details['director'] = value
-                elif 'running time' in label or 'runtime' in label:
-                    # Extract minutes from "99 minutes"
-                    runtime_match = re.search(r'(\d+)', value)
-                    if runtime_match:
-                        details['runtime'] = int(runtime_match.group(1))
-                elif 'cast' in label:
-                    details['cast'] = value
-                elif 'country' in label:
-                    details['country'] = value
-        
-        # Extract year from multiple possible locations
-        year = None
-        
-        # Try date-time element
-        date_elem = soup.find('p', class_='date-time')
-        if date_elem:
-            year_match = re.search(r'\b(19|20)\d{2}\b', date_elem.get_text())
+            return {}
+        
+        details = self.parse_movie_details(soup)
+        self.cache.set(film_url, details, expire=DETAILS_CACHE_TTL)
+        return details
+    
+    async def _fetch_detail(self, session: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                            limiter: _AsyncRateLimiter, film_url: str) -> Dict:
+        """
+        Fetch and parse one movie detail page, at most detail_concurrency at a time
+        
+        Returns:
+            Details dict, or None if the page could not be fetched or parsed
+        """
+        async with sem:
+            await limiter.wait()
+            try:
+                print(f"  Fetching {film_url}...")
+                async with session.get(film_url) as response:
+                    response.raise_for_status()
+                    html = await response.read()
+            except Exception as e:
+                print(f"  ❌ Error fetching {film_url}: {e}")
+                return None
+        
+        try:
+            return self.parse_movie_details(BeautifulSoup(html, 'lxml'))
+        except Exception as e:
+            print(f"  ⚠️  Error parsing {film_url}: {e}")
+            return None
+    
+    async def _fetch_all_details(self, film_urls: List[str]) -> Dict[str, Dict]:
+        """Fetch all movie detail pages concurrently, returning {film_url: details}"""
+        # Serve what we can from the disk cache; only fetch the misses
+        details_by_url = {}
+        for url in film_urls:
+            cached = self.cache.get(url)
+            if cached is not None:
+                details_by_url[url] = cached
+        
+        missing = [url for url in film_urls if url not in details_by_url]
+        print(f"  💾 {len(details_by_url)} cached, {len(missing)} to fetch")
+        if not missing:
+            return details_by_url
+        
+        sem = asyncio.Semaphore(self.detail_concurrency)
+        limiter = _AsyncRateLimiter(self.detail_rate)
+        connector = aiohttp.TCPConnector(limit=10, limit_per_host=self.detail_concurrency,
+                                         ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=15)
+        
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                         timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._fetch_detail(session, sem, limiter, url) for url in missing)
+            )
+        
+        for url, details in zip(missing, results):
+            # Failed fetches aren't cached so the next run retries them
+            if details is None:
+                details_by_url[url] = {}
+                continue
+            self.cache.set(url, details, expire=DETAILS_CACHE_TTL)
+            details_by_url[url] = details
+        
+        return details_by_url
+    
+    def _find_year(self, elements) -> Optional[int]:
+        """
+        Return the first 19xx/20xx year found in elements (tags or strings)
+        
+        Args:
+            elements: Iterable of BeautifulSoup tags, strings or None
+        
+        Returns:
+            Year as int, or None if no element mentions one
+        """
+        for el in elements:
+            if el is None:
+                continue
+            text = el.get_text() if hasattr(el, 'get_text') else el
+            # Cheap substring pre-check before running the regex
+            if '19' not in text and '20' not in text:
+                continue
+            year_match = _YEAR_RE.search(text)
             if year_match:
-                year = int(year_match.group())
+                return int(year_match.group())
+        return None
+    
+    def parse_movie_details(self, soup: BeautifulSoup) -> Dict:
+        """
+        Parse a movie detail page
         
-        # Try description text
+        Returns:
+            Dict with director, year, runtime, cast, description
+        """
+        details = {}
+        
+        # Walk the film details list
+        for li in soup.select('ul.film-details li'):
+            strong = li.select_one('strong')
+            if not strong:
+                continue
+            
+            label = self.clean_text(strong.get_text()).lower()
+            # Detach the <strong> label so the remaining text is the value
+            strong.extract()
+            value = self.clean_text(li.get_text())
+                
+            if 'director' in label:
+                details['director'] = value
+            elif 'running time' in label or 'runtime' in label:
+                # Extract minutes from "99 minutes"
+                runtime_match = _DIGITS_RE.search(value)
+                if runtime_match:
+                    details['runtime'] = int(runtime_match.group(1))
+            elif 'cast' in label:
+                details['cast'] = value
+            elif 'country' in label:
+                details['country'] = value
+        
+        # Description is the first paragraph after the title
+        title_elem = soup.find('h1', class_='title')
+        next_p = title_elem.find_next('p') if title_elem else None
+        if next_p:
+            desc = self.clean_text(next_p.get_text())
+            if len(desc) > 20:
+                details['description'] = desc[:500]
+        
+        # Year: date-time line, then the description, then a few early paragraphs
+        date_elem = soup.find('p', class_='date-time')
+        year = self._find_year([date_elem, next_p]) if date_elem or next_p else None
         if not year:
-            desc_text = soup.get_text()
-            year_match = re.search(r'\b(19|20)\d{2}\b', desc_text)
-            if year_match:
-                year = int(year_match.group())
+            year = self._find_year(soup.select('.description, .synopsis, p')[:10])
         
         if year:
             details['year'] = year
         
-        # Extract description (first paragraph after title)
-        title_elem = soup.find('h1', class_='title')
-        if title_elem:
-            # Find next paragraph
-            next_p = title_elem.find_next('p')
-            if next_p:
-                desc = self.clean_text(next_p.get_text())
-                if len(desc) > 20:
-                    details['description'] = desc[:500]
-        
-        time.sleep(0.5)  # Be polite
         return details
     
     def scrape(self) -> List[Dict]:
@@ -155,7 +326,7 @@ class IFCCenterScraperV2:
         print(f"IFC CENTER - MOVIE SCRAPER")
         print(f"{'='*60}")
         
-        soup = self.fetch_page(self.home_url)
+        soup = self.fetch_page(self.home_url, parse_only=HOMEPAGE_STRAINER)
         
         if not soup:
             print("❌ Failed to fetch homepage")
@@ -164,26 +335,23 @@ class IFCCenterScraperV2:
         all_movies = []
         
         # Find showtimes widget in sidebar
-        showtimes_widget = soup.find('div', id='js-showtimes-widget')
+        showtimes_widget = soup.select_one(self._SEL_WIDGET)
         
         if not showtimes_widget:
             print("❌ Could not find showtimes widget")
             return []
         
-        # Find all daily schedule sections
-        daily_schedules = showtimes_widget.find_all('div', class_='daily-schedule')
+        # Find all daily schedule sections (excluding "coming soon")
+        daily_schedules = showtimes_widget.select(self._SEL_SCHEDULES)
         
         print(f"\n📅 Found {len(daily_schedules)} days of schedules")
         
-        processed_films = {}  # Track films we've already fetched details for
+        # Pass 1: collect (title, film_url, iso_date, showtimes) from the homepage
+        entries = []
         
         for schedule_idx, schedule in enumerate(daily_schedules, 1):
-            # Skip "coming soon" section
-            if 'show-coming-soon' in schedule.get('class', []):
-                continue
-            
             # Get the date
-            date_header = schedule.find('h3')
+            date_header = schedule.select_one(self._SEL_DATE_HEADER)
             if not date_header:
                 continue
             
@@ -197,16 +365,12 @@ class IFCCenterScraperV2:
             print(f"\n[{schedule_idx}/{len(daily_schedules)}] 📅 Processing {date_str} ({iso_date})")
             
             # Find all film items for this day
-            film_items = schedule.find_all('li')
+            film_items = schedule.select(self._SEL_FILM_ITEMS)
             
             for film_item in film_items:
                 try:
                     # Get film title and link
-                    title_link = film_item.find('h3')
-                    if not title_link:
-                        continue
-                    
-                    link_elem = title_link.find('a')
+                    link_elem = film_item.select_one(self._SEL_TITLE_LINK)
                     if not link_elem:
                         continue
                     
@@ -216,65 +380,61 @@ class IFCCenterScraperV2:
                     if not title or len(title) < 2:
                         continue
                     
-                    # Make URL absolute
+                    # Make URL absolute, then canonicalize so the same film listed with a
+                    # different query string or trailing slash is only fetched once
                     if film_url and not film_url.startswith('http'):
                         film_url = f"{self.base_url}{film_url}"
+                    if film_url:
+                        film_url = self._norm(film_url)
                     
                     # Get showtimes for this day
-                    times_ul = film_item.find('ul', class_='times')
-                    if not times_ul:
-                        continue
-                    
-                    showtimes = []
-                    for time_link in times_ul.find_all('a'):
-                        time_text = self.clean_text(time_link.get_text())
-                        if time_text:
-                            showtimes.append(time_text)
+                    showtimes = [
+                        time_text
+                        for time_text in (self.clean_text(a.get_text())
+                                          for a in film_item.select(self._SEL_SHOWTIMES))
+                        if time_text
+                    ]
                     
                     if not showtimes:
                         continue
                     
-                    # Format dates string
-                    dates_str = f"{iso_date} ({', '.join(showtimes)})"
-                    
-                    # Get film details (only fetch once per film)
-                    director = None
-                    year = None
-                    description = None
-                    
-                    if film_url and film_url not in processed_films:
-                        print(f"  🎬 {title}")
-                        details = self.extract_movie_details(film_url)
-                        processed_films[film_url] = details
-                    else:
-                        details = processed_films.get(film_url, {})
-                    
-                    director = details.get('director')
-                    year = details.get('year')
-                    description = details.get('description')
-                    
-                    # Create movie entry
-                    movie = {
-                        'title': title,
-                        'theater': self.name,
-                        'theater_id': self.theater_id,
-                        'location': self.location,
-                        'website': self.website,
-                        'film_link': film_url,
-                        'director': director,
-                        'year': year,
-                        'dates': dates_str,
-                        'description': description,
-                        'scraped_at': datetime.now()
-                    }
-                    
-                    all_movies.append(movie)
-                    print(f"    ✓ {iso_date}: {', '.join(showtimes)}")
+                    entries.append((title, film_url, iso_date, showtimes))
                     
                 except Exception as e:
                     print(f"  ⚠️  Error parsing film: {e}")
                     continue
         
+        # Pass 2: fetch every distinct film detail page concurrently (once per film)
+        film_urls = list(dict.fromkeys(url for _, url, _, _ in entries if url))
+        print(f"\n🎬 Fetching details for {len(film_urls)} films...")
+        processed_films = asyncio.run(self._fetch_all_details(film_urls))
+        
+        # Pass 3: build one movie entry per film per day
+        for title, film_url, iso_date, showtimes in entries:
+            details = processed_films.get(film_url, {})
+            
+            # Format dates string
+            dates_str = f"{iso_date} ({', '.join(showtimes)})"
+            
+            # Create movie entry
+            movie = {
+                'title': title,
+                'theater': self.name,
+                'theater_id': self.theater_id,
+                'location': self.location,
+                'website': self.website,
+                'film_link': film_url,
+                'director': details.get('director'),
+                'year': details.get('year'),
+                'dates': dates_str,
+                'description': details.get('description'),
+                # Per-row: a film has one row per date, and UNIQUE(title, theater, scraped_at)
+                'scraped_at': datetime.now()
+            }
+            
+            all_movies.append(movie)
+            print(f"    ✓ {title} - {iso_date}: {', '.join(showtimes)}")
+        
         print(f"\n{'='*60}")
         print(f"✅ TOTAL ENTRIES CREATED: {len(all_movies)}")
         print(f"{'='*60}\n")
@@ -288,34 +448,21 @@ def save_to_db(movies: List[Dict]) -> None:
         print("⚠️  No movies to save")
         return
     
-    print(f"💾 Preparing to save {len(movies)} entries...")
+    from storage.postgres import (
+        insert_many_db, refresh_recent_movies, movie_rows, MOVIES_SCRAPE_COLUMNS, MOVIES_UPSERT
+    )
     
-    # Prepare data for bulk insert
-    columns = ['title', 'theater', 'theater_id', 'location', 'website', 'film_link',
-               'director', 'year', 'dates', 'description', 'scraped_at']
+    print(f"💾 Preparing to save {len(movies)} entries...")
     
-    values = []
-    for movie in movies:
-        values.append((
-            movie.get('title'),
-            movie.get('theater'),
-            movie.get('theater_id'),
-            movie.get('location'),
-            movie.get('website'),
-            movie.get('film_link'),
-            movie.get('director'),
-            movie.get('year'),
-            movie.get('dates'),
-            movie.get('description'),
-            movie.get('scraped_at')
-        ))
+    columns, values = MOVIES_SCRAPE_COLUMNS, movie_rows(movies)
     
-    print(f"  ✓ Data prepared. Columns: {len(columns)}, Rows: {len(values)}")
+    print(f"  ✓ Data prepared. Columns: {len(columns)}, Rows: {len(movies)}")
     
     try:
         print("  → Calling insert_many_db()...")
-        insert_many_db('movies', columns, values)
+        insert_many_db('movies', columns, values, on_conflict=MOVIES_UPSERT)
         print(f"💾 Successfully saved {len(movies)} entries to database")
+        refresh_recent_movies()
     except Exception as e:
         print(f"❌ Error saving to database: {e}")
         import traceback
@@ -324,6 +471,15 @@ def save_to_db(movies: List[Dict]) -> None:
 
 def main():
     """Run scraper as standalone script"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Scrape IFC Center schedule')
+    parser.add_argument('--refresh-cache', action='store_true',
+                       help='Clear cached film details and re-fetch every detail page')
+    args = parser.parse_args()
+    
+    from storage.postgres import create_tables
+    
     # Ensure tables exist
     try:
         create_tables()
@@ -331,8 +487,8 @@ def main():
         print(f"⚠️  Warning: Could not verify tables: {e}")
     
     # Run scraper
-    scraper = IFCCenterScraperV2()
-    movies = scraper.scrape()
+    with IFCCenterScraperV2(refresh_cache=args.refresh_cache) as scraper:
+        movies = scraper.scrape()
     
     # Display summary
     if movies:
@@ -352,8 +508,8 @@ def main():
         print("\n🎬 Enriching with TMDB data...")
         try:
             sys.path.insert(0, str(Path(__file__).parent.parent / 'enrichment'))
-            from tmdb_enricher import TMDBEnricher
-            enricher = TMDBEnricher()
+            from tmdb_enricher import get_enricher
+            enricher = get_enricher()
             enricher.enrich_recent(hours=1)
         except Exception as e:
             print(f"⚠️  TMDB enrichment failed (non-critical): {e}")
@@ -3,27 +3,55 @@ Metrograph Theater Scraper V2
 Scrapes movie schedules from Metrograph NYC with improved date handling
 """
 
+import asyncio
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin
 from datetime import datetime
 import re
 import sys
-import time
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional
 
-# Add utils to path
+# Add utils to path (storage.postgres is imported lazily, only once there is data to save)
 sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
-from storage.postgres import insert_many_db, create_tables
 
 # Add enrichment to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'enrichment'))
 
+# Patterns used on every page, compiled once
+# Year or "Directed by ..." in one pass over the metadata line
+_META_RE = re.compile(
+    r'(?P<year>\b(?:19|20)\d{2}\b)|(?:Directed by|Dir\.?|By)\s+(?P<director>[^,\d]+)',
+    re.IGNORECASE
+)
+
+
+# The schedule page only matters for its day-selector links
+DAY_SELECTOR_STRAINER = SoupStrainer('a', class_='day-selector-day')
+
+
+def day_strainer(date_str: str) -> SoupStrainer:
+    """Strainer keeping only the calendar-list section for one date"""
+    return SoupStrainer(id=f'calendar-list-day-{date_str}')
+
 
 class MetrographScraperV2:
     """Enhanced scraper for Metrograph with date-specific scraping"""
     
+    # CSS selectors for the schedule pages
+    _SEL_DAY_LINKS = 'a.day-selector-day'
+    _SEL_FILM_ITEMS = 'div.film-thumbnail'
+    _SEL_TITLE = 'a.title'
+    _SEL_METADATA = 'div.film-metadata'
+    _SEL_DESCRIPTION = 'div.film-description'
+    _SEL_SHOWTIMES = 'div.showtimes a'
+    
     def __init__(self):
         self.name = 'Metrograph'
         self.theater_id = 'metrograph'
@@ -34,24 +62,58 @@ class MetrographScraperV2:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        
+        # Keep-alive session: every request to the site reuses pooled connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Per-date schedule pages are fetched concurrently, capped at this many in flight
+        self.date_concurrency = 6
+        # Page parsing runs on worker threads so it doesn't stall the event loop
+        self.parse_workers = 4
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.session.close()
     
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a web page"""
+    def fetch_page(self, url: str, parse_only: Optional[SoupStrainer] = None) -> Optional[BeautifulSoup]:
+        """
+        Fetch and parse a web page
+        
+        Args:
+            url: Page URL
+            parse_only: Optional SoupStrainer limiting which part of the page is parsed
+        """
         try:
             print(f"  Fetching {url}...")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, 'lxml', parse_only=parse_only)
         except Exception as e:
             print(f"  ❌ Error fetching {url}: {e}")
             return None
     
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
+    def _join(self, path: str) -> str:
+        """Absolute URL for an href (plain concatenation for the common '/...' case)"""
+        if path.startswith('http'):
+            return path
+        if path.startswith('/'):
+            return self.base_url + path
+        return urljoin(self.base_url + '/', path)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def clean_text(text: str) -> str:
+        """Clean and normalize text (memoized - titles and descriptions repeat across dates)"""
         if not text:
             return ""
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return ' '.join(text.split())
     
     def parse_metadata(self, metadata: str) -> tuple:
         """
@@ -69,19 +131,16 @@ class MetrographScraperV2:
         if not metadata:
             return director, year
         
-        # Extract year (4-digit number)
-        year_match = re.search(r'\b(19|20)\d{2}\b', metadata)
-        if year_match:
-            year = int(year_match.group())
-        
-        # Extract director (text after "Directed by" or similar)
-        director_match = re.search(
-            r'(?:Directed by|Dir\.?|By)\s+([^,\d]+)',
-            metadata,
-            re.IGNORECASE
-        )
-        if director_match:
-            director = self.clean_text(director_match.group(1))
+        # First year (4-digit number) and first director ("Directed by ...") in one scan
+        for match in _META_RE.finditer(metadata):
+            if match.group('year'):
+                if year is None:
+                    year = int(match.group('year'))
+            elif director is None:
+                director = self.clean_text(match.group('director'))
+            
+            if year is not None and director is not None:
+                break
         
         return director, year
     
@@ -89,11 +148,11 @@ class MetrographScraperV2:
         """Get all future dates that have showtimes scheduled"""
         print(f"\n📅 Fetching available dates from {self.name}...")
         
-        soup = self.fetch_page(self.schedule_url)
+        soup = self.fetch_page(self.schedule_url, parse_only=DAY_SELECTOR_STRAINER)
         if not soup:
             return []
         
-        date_links = soup.find_all('a', class_='day-selector-day')
+        date_links = soup.select(self._SEL_DAY_LINKS)
         
         available_dates = []
         for link in date_links:
@@ -110,14 +169,62 @@ class MetrographScraperV2:
         
         return available_dates
     
+    def date_url(self, date_str: str) -> str:
+        """Schedule URL for a specific date"""
+        return f"{self.schedule_url}?date={date_str}"
+    
     def get_movies_for_date(self, date_str: str) -> List[Dict]:
         """Get all movies for a specific date"""
-        url = f"{self.schedule_url}?date={date_str}"
-        soup = self.fetch_page(url)
+        soup = self.fetch_page(self.date_url(date_str), parse_only=day_strainer(date_str))
         
         if not soup:
             return []
         
+        return self.parse_movies_for_date(soup, date_str)
+    
+    def _parse_day(self, html: bytes, date_str: str) -> List[Dict]:
+        """Parse raw schedule HTML for one date (runs on a parse worker thread)"""
+        soup = BeautifulSoup(html, 'lxml', parse_only=day_strainer(date_str))
+        return self.parse_movies_for_date(soup, date_str)
+    
+    async def _fetch_date(self, session: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                          pool: ThreadPoolExecutor, date_str: str) -> List[Dict]:
+        """Fetch and parse one date's schedule page, at most date_concurrency at a time"""
+        url = self.date_url(date_str)
+        async with sem:
+            try:
+                print(f"  Fetching {url}...")
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    html = await response.read()
+            except Exception as e:
+                print(f"  ❌ Error fetching {url}: {e}")
+                return []
+            finally:
+                await asyncio.sleep(0.1)  # Be polite
+        
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, self._parse_day, html, date_str)
+        except Exception as e:
+            print(f"  ⚠️  Error parsing {url}: {e}")
+            return []
+    
+    async def _fetch_all_dates(self, dates: List[str]) -> List[List[Dict]]:
+        """Fetch all date pages concurrently, returning movie lists in date order"""
+        sem = asyncio.Semaphore(self.date_concurrency)
+        connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=30, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=15)
+        
+        with ThreadPoolExecutor(max_workers=self.parse_workers) as pool:
+            async with aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                             timeout=timeout) as session:
+                return await asyncio.gather(
+                    *(self._fetch_date(session, sem, pool, date) for date in dates)
+                )
+    
+    def parse_movies_for_date(self, soup: BeautifulSoup, date_str: str) -> List[Dict]:
+        """Parse all movies from a date's schedule page"""
         # Find the specific date section
         day_section = soup.find('div', id=f'calendar-list-day-{date_str}')
         
@@ -125,12 +232,20 @@ class MetrographScraperV2:
             return []
         
         movies = []
-        movie_items = day_section.find_all('div', class_='film-thumbnail')
+        movie_items = day_section.select(self._SEL_FILM_ITEMS)
+        
+        # Fields shared by every movie on the page
+        base = {
+            'theater': self.name,
+            'theater_id': self.theater_id,
+            'location': self.location,
+            'website': self.website,
+        }
         
         for item in movie_items:
             try:
                 # Extract title
-                title_elem = item.find('a', class_='title')
+                title_elem = item.select_one(self._SEL_TITLE)
                 if not title_elem:
                     continue
                 
@@ -140,28 +255,26 @@ class MetrographScraperV2:
                 
                 # Extract film link
                 film_path = title_elem.get('href')
-                film_link = urljoin(self.base_url, film_path) if film_path else None
+                film_link = self._join(film_path) if film_path else None
                 
                 # Extract metadata (director, year, format)
-                metadata_elem = item.find('div', class_='film-metadata')
+                metadata_elem = item.select_one(self._SEL_METADATA)
                 metadata = self.clean_text(metadata_elem.get_text()) if metadata_elem else None
                 
                 # Parse director and year from metadata
                 director, year = self.parse_metadata(metadata)
                 
                 # Extract description (Q&A, intro, etc.)
-                description_elem = item.find('div', class_='film-description')
+                description_elem = item.select_one(self._SEL_DESCRIPTION)
                 description = self.clean_text(description_elem.get_text()) if description_elem else None
                 
                 # Extract showtimes
-                showtimes_div = item.find('div', class_='showtimes')
-                showtimes = []
-                if showtimes_div:
-                    time_links = showtimes_div.find_all('a')
-                    for link in time_links:
-                        time_text = self.clean_text(link.get_text())
-                        if time_text:
-                            showtimes.append(time_text)
+                showtimes = [
+                    time_text
+                    for time_text in (self.clean_text(link.get_text())
+                                      for link in item.select(self._SEL_SHOWTIMES))
+                    if time_text
+                ]
                 
                 # Format dates string
                 dates_str = f"{date_str}"
@@ -169,16 +282,14 @@ class MetrographScraperV2:
                     dates_str += f" ({', '.join(showtimes[:3])})"  # Show first 3 showtimes
                 
                 movie = {
+                    **base,
                     'title': title,
-                    'theater': self.name,
-                    'theater_id': self.theater_id,
-                    'location': self.location,
-                    'website': self.website,
                     'film_link': film_link,
                     'director': director,
                     'year': year,
                     'dates': dates_str,
                     'description': description,
+                    # Per-row: a film has one row per date, and UNIQUE(title, theater, scraped_at)
                     'scraped_at': datetime.now()
                 }
                 
@@ -203,12 +314,14 @@ class MetrographScraperV2:
             print("❌ No available dates found")
             return []
         
-        # Fetch movies for each date
+        # Fetch every date's page concurrently
+        print(f"\n🎬 Fetching movies for {len(available_dates)} dates...")
+        movies_by_date = asyncio.run(self._fetch_all_dates(available_dates))
+        
         all_movies = []
         
-        for i, date in enumerate(available_dates, 1):
-            print(f"\n[{i}/{len(available_dates)}] 🎬 Fetching movies for {date}...")
-            movies = self.get_movies_for_date(date)
+        for i, (date, movies) in enumerate(zip(available_dates, movies_by_date), 1):
+            print(f"\n[{i}/{len(available_dates)}] 🎬 {date}")
             
             if movies:
                 all_movies.extend(movies)
@@ -217,10 +330,6 @@ class MetrographScraperV2:
                     print(f"    • {movie['title']}")
             else:
                 print(f"  ⚠️  No movies found")
-            
-            # Be polite to the server
-            if i < len(available_dates):
-                time.sleep(0.5)
         
         print(f"\n{'='*60}")
         print(f"✅ TOTAL MOVIES FOUND: {len(all_movies)}")
@@ -235,44 +344,23 @@ def save_to_db(movies: List[Dict]) -> None:
         print("⚠️  No movies to save")
         return
     
-    # Prepare data for bulk insert
-    columns = ['title', 'theater', 'theater_id', 'location', 'website', 'film_link',
-               'director', 'year', 'dates', 'description', 'scraped_at']
-    
-    values = []
-    for movie in movies:
-        values.append((
-            movie.get('title'),
-            movie.get('theater'),
-            movie.get('theater_id'),
-            movie.get('location'),
-            movie.get('website'),
-            movie.get('film_link'),
-            movie.get('director'),
-            movie.get('year'),
-            movie.get('dates'),
-            movie.get('description'),
-            movie.get('scraped_at')
-        ))
+    from storage.postgres import (
+        insert_many_db, refresh_recent_movies, movie_rows, MOVIES_SCRAPE_COLUMNS, MOVIES_UPSERT
+    )
     
     try:
-        insert_many_db('movies', columns, values)
+        insert_many_db('movies', MOVIES_SCRAPE_COLUMNS, movie_rows(movies), on_conflict=MOVIES_UPSERT)
         print(f"💾 Successfully saved {len(movies)} movies to database")
+        refresh_recent_movies()
     except Exception as e:
         print(f"❌ Error saving to database: {e}")
 
 
 def main():
     """Run scraper as standalone script"""
-    # Ensure tables exist
-    try:
-        create_tables()
-    except Exception as e:
-        print(f"⚠️  Warning: Could not verify tables: {e}")
-    
     # Run scraper
-    scraper = MetrographScraperV2()
-    movies = scraper.scrape()
+    with MetrographScraperV2() as scraper:
+        movies = scraper.scrape()
     
     # Display summary
     if movies:
@@ -283,6 +371,13 @@ def main():
         print(f"Unique titles: {unique_titles}")
         print(f"Date range covered: {len(set(m['dates'] for m in movies))} unique date strings")
         
+        # Ensure tables exist (only worth a DB round-trip once there is something to save)
+        from storage.postgres import create_tables
+        try:
+            create_tables()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not verify tables: {e}")
+        
         # Save to database
         print("\n💾 Saving to database...")
         save_to_db(movies)
@@ -290,8 +385,8 @@ def main():
         # Enrich with TMDB data
         print("\n🎬 Enriching with TMDB data...")
         try:
-            from tmdb_enricher import TMDBEnricher
-            enricher = TMDBEnricher()
+            from tmdb_enricher import get_enricher
+            enricher = get_enricher()
             enricher.enrich_recent(hours=1)
         except Exception as e:
             print(f"⚠️  TMDB enrichment failed (non-critical): {e}")
@@ -4,25 +4,54 @@ Scrapes movie schedules from Syndicated BK in Brooklyn
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import date, datetime
+from urllib.parse import urljoin
 import re
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional
 
-# Add utils to path
+# Add utils to path (storage.postgres is imported lazily, only once there is data to save)
 sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
-from storage.postgres import insert_many_db, create_tables
 
 # Add enrichment to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'enrichment'))
 
+# Patterns used on every page, compiled once
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_DATE_RE = re.compile(r'(\d+),\s+(\w+)')
+# Year or director credit ("Directed by" / "Director:" / "Dir.") in one pass
+_META_RE = re.compile(
+    r'(?P<year>\b(?:19|20)\d{2}\b)'
+    r'|(?:[Dd]irected by\s+|[Dd]irector[:\s]+|[Dd]ir\.?\s+)(?P<director>[^,.\n]+)'
+)
+_TRAILING_RE = re.compile(r'\s+(stars?|starring|features?|with).*$', re.IGNORECASE)
+
+# Month name -> number (lowercase keys; avoids locale-dependent strptime)
+_MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+
 
 class SyndicatedBKScraper:
     """Scraper for Syndicated Bar Theater Kitchen"""
     
+    # CSS selectors for the "sort by film" sessions listing
+    _SEL_BY_FILM = '#sessionsByFilmConent'
+    _SEL_FILMS = 'div.film'
+    _SEL_TITLE = 'h3.title'
+    _SEL_DESCRIPTION = 'p.film-desc'
+    _SEL_CENSOR = 'span.censor'
+    _SEL_DATE_CONTAINERS = 'div.date-container'
+    _SEL_DATE_HEADER = 'h4.date'
+    _SEL_SESSION_LINKS = 'ul.session-times a'
+    
     def __init__(self):
         self.name = 'Syndicated BK'
         self.theater_id = 'syndicated_bk'
@@ -33,24 +62,47 @@ class SyndicatedBKScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        
+        # Keep-alive session: every request to the site reuses pooled connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.session.close()
     
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """Fetch and parse a web page"""
         try:
             print(f"  Fetching {url}...")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, 'lxml')
         except Exception as e:
             print(f"  ❌ Error fetching {url}: {e}")
             return None
     
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
+    def _join(self, path: str) -> str:
+        """Absolute URL for an href (plain concatenation for the common '/...' case)"""
+        if path.startswith('http'):
+            return path
+        if path.startswith('/'):
+            return self.base_url + path
+        return urljoin(self.base_url + '/', path)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def clean_text(text: str) -> str:
+        """Clean and normalize text (memoized - titles and descriptions repeat across dates)"""
         if not text:
             return ""
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        return ' '.join(text.split())
     
     def parse_date_to_iso(self, date_str: str, year: int = 2025) -> Optional[str]:
         """
@@ -65,18 +117,17 @@ class SyndicatedBKScraper:
         """
         try:
             # Extract day and month from format like "Friday 10, October"
-            match = re.search(r'(\d+),\s+(\w+)', date_str)
+            match = _DATE_RE.search(date_str)
             if not match:
                 return None
             
-            day = match.group(1)
-            month = match.group(2)
-            
-            # Create date string and parse
-            date_string = f"{day} {month} {year}"
-            parsed_date = datetime.strptime(date_string, "%d %B %Y")
+            day = int(match.group(1))
+            month = _MONTHS.get(match.group(2).lower())
+            if not month:
+                return None
             
-            return parsed_date.strftime("%Y-%m-%d")
+            # date() still rejects impossible days like "31, February"
+            return date(year, month, day).isoformat()
         except Exception as e:
             print(f"  ⚠️  Error parsing date '{date_str}': {e}")
             return None
@@ -97,26 +148,25 @@ class SyndicatedBKScraper:
         if not description:
             return director, year
         
-        # Extract year (4-digit number)
-        year_match = re.search(r'\b(19|20)\d{2}\b', description)
-        if year_match:
-            year = int(year_match.group())
-        
-        # Extract director (look for common patterns)
-        director_patterns = [
-            r'[Dd]irected by\s+([^,.\n]+)',
-            r'[Dd]irector[:\s]+([^,.\n]+)',
-            r'[Dd]ir\.?\s+([^,.\n]+)',
-        ]
-        
-        for pattern in director_patterns:
-            director_match = re.search(pattern, description)
-            if director_match:
-                director = self.clean_text(director_match.group(1))
+        # First year (4-digit number) and first director credit in one scan
+        for match in _META_RE.finditer(description):
+            if match.group('year'):
+                if year is None:
+                    year = int(match.group('year'))
+            elif director is None:
+                director = self.clean_text(match.group('director'))
                 # Clean up common trailing text
-                director = re.sub(r'\s+(stars?|starring|features?|with).*$', '', director, flags=re.IGNORECASE)
+                director = _TRAILING_RE.sub('', director)
+            
+            if year is not None and director is not None:
                 break
         
+        # A credit like "Directed by X (2023)" swallows the year - look for it separately
+        if year is None and director is not None:
+            year_match = _YEAR_RE.search(description)
+            if year_match:
+                year = int(year_match.group())
+        
         return director, year
     
     def scrape(self) -> List[Dict]:
@@ -132,21 +182,29 @@ class SyndicatedBKScraper:
             return []
         
         # Find the "Sort by film" section which has complete data
-        by_film_section = soup.find('div', id='sessionsByFilmConent')
+        by_film_section = soup.select_one(self._SEL_BY_FILM)
         
         if not by_film_section:
             print("❌ Could not find 'by film' section")
             return []
         
         all_movies = []
-        film_items = by_film_section.find_all('div', class_='film')
+        film_items = by_film_section.select(self._SEL_FILMS)
         
         print(f"\n📅 Found {len(film_items)} unique films")
         
+        # Fields shared by every movie on the page
+        base = {
+            'theater': self.name,
+            'theater_id': self.theater_id,
+            'location': self.location,
+            'website': self.website,
+        }
+        
         for film_idx, film in enumerate(film_items, 1):
             try:
                 # Extract title
-                title_elem = film.find('h3', class_='title')
+                title_elem = film.select_one(self._SEL_TITLE)
                 if not title_elem:
                     continue
                 
@@ -157,18 +215,27 @@ class SyndicatedBKScraper:
                 print(f"\n[{film_idx}/{len(film_items)}] 🎬 Processing: {title}")
                 
                 # Extract description
-                desc_elem = film.find('p', class_='film-desc')
+                desc_elem = film.select_one(self._SEL_DESCRIPTION)
                 description = self.clean_text(desc_elem.get_text()) if desc_elem else None
                 
                 # Parse metadata from description
                 director, year = self.parse_metadata(description)
                 
                 # Extract rating/censor
-                censor_elem = film.find('span', class_='censor')
+                censor_elem = film.select_one(self._SEL_CENSOR)
                 rating = self.clean_text(censor_elem.get_text()) if censor_elem else None
                 
+                # Fields shared by every date this film plays
+                film_base = {
+                    **base,
+                    'title': title,
+                    'director': director,
+                    'year': year,
+                    'description': description,
+                }
+                
                 # Find all date containers for this film
-                date_containers = film.find_all('div', class_='date-container')
+                date_containers = film.select(self._SEL_DATE_CONTAINERS)
                 
                 if not date_containers:
                     print(f"  ⚠️  No dates found")
@@ -177,7 +244,7 @@ class SyndicatedBKScraper:
                 # Process each date
                 for date_container in date_containers:
                     # Get the date
-                    date_header = date_container.find('h4', class_='date')
+                    date_header = date_container.select_one(self._SEL_DATE_HEADER)
                     if not date_header:
                         continue
                     
@@ -189,16 +256,15 @@ class SyndicatedBKScraper:
                         continue
                     
                     # Extract all showtimes for this date
-                    session_times = date_container.find('ul', class_='session-times')
-                    if not session_times:
+                    time_links = date_container.select(self._SEL_SESSION_LINKS)
+                    if not time_links:
                         continue
                     
-                    time_links = session_times.find_all('a')
                     showtimes = []
                     film_link = None
                     
                     for link in time_links:
-                        time_elem = link.find('time')
+                        time_elem = link.select_one('time')
                         if time_elem:
                             showtime = self.clean_text(time_elem.get_text())
                             if showtime:
@@ -206,11 +272,7 @@ class SyndicatedBKScraper:
                         
                         # Get film link from first showtime link
                         if not film_link and link.get('href'):
-                            href = link.get('href')
-                            if href.startswith('http'):
-                                film_link = href
-                            else:
-                                film_link = f"{self.base_url}{href}"
+                            film_link = self._join(link.get('href'))
                     
                     if not showtimes:
                         continue
@@ -220,16 +282,10 @@ class SyndicatedBKScraper:
                     
                     # Create movie entry for this specific date
                     movie = {
-                        'title': title,
-                        'theater': self.name,
-                        'theater_id': self.theater_id,
-                        'location': self.location,
-                        'website': self.website,
+                        **film_base,
                         'film_link': film_link,
-                        'director': director,
-                        'year': year,
                         'dates': dates_str,
-                        'description': description,
+                        # Per-row: one row per date, and UNIQUE(title, theater, scraped_at)
                         'scraped_at': datetime.now()
                     }
                     
@@ -253,35 +309,22 @@ def save_to_db(movies: List[Dict]) -> None:
         print("⚠️  No movies to save")
         return
     
-    print(f"💾 Preparing to save {len(movies)} entries...")
+    from storage.postgres import (
+        insert_many_db, refresh_recent_movies, movie_rows, MOVIES_SCRAPE_COLUMNS, MOVIES_UPSERT
+    )
     
-    # Prepare data for bulk insert
-    columns = ['title', 'theater', 'theater_id', 'location', 'website', 'film_link',
-               'director', 'year', 'dates', 'description', 'scraped_at']
+    print(f"💾 Preparing to save {len(movies)} entries...")
     
-    values = []
-    for movie in movies:
-        values.append((
-            movie.get('title'),
-            movie.get('theater'),
-            movie.get('theater_id'),
-            movie.get('location'),
-            movie.get('website'),
-            movie.get('film_link'),
-            movie.get('director'),
-            movie.get('year'),
-            movie.get('dates'),
-            movie.get('description'),
-            movie.get('scraped_at')
-        ))
+    columns, values = MOVIES_SCRAPE_COLUMNS, list(movie_rows(movies))
     
     print(f"  ✓ Data prepared. Columns: {len(columns)}, Rows: {len(values)}")
     print(f"  ✓ First row sample: {values[0][:3]}...")
     
     try:
         print("  → Calling insert_many_db()...")
-        insert_many_db('movies', columns, values)
+        insert_many_db('movies', columns, values, on_conflict=MOVIES_UPSERT)
         print(f"💾 Successfully saved {len(movies)} entries to database")
+        refresh_recent_movies()
     except Exception as e:
         print(f"❌ Error saving to database: {e}")
         import traceback
@@ -290,15 +333,9 @@ def save_to_db(movies: List[Dict]) -> None:
 
 def main():
     """Run scraper as standalone script"""
-    # Ensure tables exist
-    try:
-        create_tables()
-    except Exception as e:
-        print(f"⚠️  Warning: Could not verify tables: {e}")
-    
     # Run scraper
-    scraper = SyndicatedBKScraper()
-    movies = scraper.scrape()
+    with SyndicatedBKScraper() as scraper:
+        movies = scraper.scrape()
     
     # Display summary
     if movies:
@@ -310,6 +347,13 @@ def main():
         print(f"Unique titles: {unique_titles}")
         print(f"Unique dates: {unique_dates}")
         
+        # Ensure tables exist (only worth a DB round-trip once there is something to save)
+        from storage.postgres import create_tables
+        try:
+            create_tables()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not verify tables: {e}")
+        
         # Save to database
         print("\n💾 Saving to database...")
         save_to_db(movies)
@@ -317,8 +361,8 @@ def main():
         # Enrich with TMDB data
         print("\n🎬 Enriching with TMDB data...")
         try:
-            from tmdb_enricher import TMDBEnricher
-            enricher = TMDBEnricher()
+            from tmdb_enricher import get_enricher
+            enricher = get_enricher()
             enricher.enrich_recent(hours=1)
         except Exception as e:
             print(f"⚠️  TMDB enrichment failed (non-critical): {e}")
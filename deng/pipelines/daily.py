@@ -1,22 +1,94 @@
 #!/usr/bin/env python3
 """
 Daily Pipeline for Indieflix
-Runs all ingestion scripts in sequence to update movie data
+Runs all ingestion scripts concurrently, saves their movies in one batch,
+then enriches them with TMDB data
 Designed to be run as a cron job
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 # Add parent directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'ingestion'))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'enrichment'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'utils'))
 
-from metrograph_v2 import MetrographScraperV2, save_to_db as save_metrograph
-from syndicatedbk import SyndicatedBKScraper, save_to_db as save_syndicated
-from ifc_center_v2 import IFCCenterScraperV2, save_to_db as save_ifc
-from tmdb_enricher import TMDBEnricher
+from metrograph_v2 import MetrographScraperV2
+from syndicatedbk import SyndicatedBKScraper
+from ifc_center_v2 import IFCCenterScraperV2
+from tmdb_enricher import get_enricher
+from storage.postgres import (
+    create_tables, copy_binary_db, db_session, refresh_recent_movies, movie_rows,
+    MOVIES_COPY_TYPES, MOVIES_SCRAPE_COLUMNS, MOVIES_UPSERT
+)
+
+
+def run_metrograph() -> Tuple[str, List[Dict], Optional[str]]:
+    """Scrape Metrograph, returning (step, movies, error)"""
+    try:
+        with MetrographScraperV2() as scraper:
+            movies = scraper.scrape()
+        print(f"✅ Metrograph: {len(movies)} movies scraped\n")
+        return 'metrograph', movies, None
+    except Exception as e:
+        print(f"❌ Metrograph failed: {e}\n")
+        return 'metrograph', [], str(e)
+
+
+def run_syndicated() -> Tuple[str, List[Dict], Optional[str]]:
+    """Scrape Syndicated BK, returning (step, movies, error)"""
+    try:
+        with SyndicatedBKScraper() as scraper:
+            movies = scraper.scrape()
+        print(f"✅ Syndicated BK: {len(movies)} movies scraped\n")
+        return 'syndicated', movies, None
+    except Exception as e:
+        print(f"❌ Syndicated BK failed: {e}\n")
+        return 'syndicated', [], str(e)
+
+
+def run_ifc() -> Tuple[str, List[Dict], Optional[str]]:
+    """Scrape IFC Center, returning (step, movies, error)"""
+    try:
+        with IFCCenterScraperV2() as scraper:
+            movies = scraper.scrape()
+        print(f"✅ IFC Center: {len(movies)} movies scraped\n")
+        return 'ifc_center', movies, None
+    except Exception as e:
+        print(f"❌ IFC Center failed: {e}\n")
+        return 'ifc_center', [], str(e)
+
+
+def save_all(scraped: Dict[str, List[Dict]]) -> None:
+    """
+    Insert every scraper's movies in a single batch (one transaction)
+    
+    Args:
+        scraped: {step: movies} for the scrapers that succeeded
+    
+    Example:
+        save_all({'metrograph': [...], 'ifc_center': [...]})
+    """
+    all_values = []
+    for movies in scraped.values():
+        all_values.extend(movie_rows(movies))
+    
+    if not all_values:
+        print("⚠️  No movies to save")
+        return
+    
+    # Binary COPY: the server skips text parsing for years and timestamps.
+    # A lost commit after a crash is just re-scraped, so skip the WAL fsync wait
+    columns = MOVIES_SCRAPE_COLUMNS
+    types = [MOVIES_COPY_TYPES[col] for col in columns]
+    with db_session(synchronous_commit=False) as conn:
+        copy_binary_db('movies', columns, all_values, types, conn=conn, on_conflict=MOVIES_UPSERT)
+    print(f"💾 Saved {len(all_values)} movies to database")
+    refresh_recent_movies()
 
 
 def run_pipeline():
@@ -27,6 +99,12 @@ def run_pipeline():
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60 + "\n")
     
+    # Ensure tables exist once for the whole run
+    try:
+        create_tables()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify tables: {e}\n")
+    
     results = {
         'metrograph': {'success': False, 'count': 0},
         'syndicated': {'success': False, 'count': 0},
@@ -34,56 +112,48 @@ def run_pipeline():
         'enrichment': {'success': False, 'count': 0}
     }
     
-    # 1. Scrape Metrograph
-    print("📽️  STEP 1: Scraping Metrograph...")
-    print("-" * 60)
-    try:
-        scraper = MetrographScraperV2()
-        movies = scraper.scrape()
-        save_metrograph(movies)
-        results['metrograph'] = {'success': True, 'count': len(movies)}
-        print(f"✅ Metrograph: {len(movies)} movies scraped\n")
-    except Exception as e:
-        print(f"❌ Metrograph failed: {e}\n")
-        results['metrograph'] = {'success': False, 'error': str(e)}
-    
-    # 2. Scrape Syndicated BK
-    print("📽️  STEP 2: Scraping Syndicated BK...")
+    # 1-3. Scrape all theaters concurrently (independent, I/O-bound sites)
+    print("📽️  STEPS 1-3: Scraping Metrograph, Syndicated BK and IFC Center...")
     print("-" * 60)
-    try:
-        scraper = SyndicatedBKScraper()
-        movies = scraper.scrape()
-        save_syndicated(movies)
-        results['syndicated'] = {'success': True, 'count': len(movies)}
-        print(f"✅ Syndicated BK: {len(movies)} movies scraped\n")
-    except Exception as e:
-        print(f"❌ Syndicated BK failed: {e}\n")
-        results['syndicated'] = {'success': False, 'error': str(e)}
+    scraped = {}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(step) for step in (run_metrograph, run_syndicated, run_ifc)]
+        for future in as_completed(futures):
+            step, movies, error = future.result()
+            if error is None:
+                scraped[step] = movies
+                results[step] = {'success': True, 'count': len(movies)}
+            else:
+                results[step] = {'success': False, 'error': error}
     
-    # 3. Scrape IFC Center
-    print("📽️  STEP 3: Scraping IFC Center...")
+    # Save every theater's movies in one batch
+    print("💾 Saving scraped movies...")
     print("-" * 60)
     try:
-        scraper = IFCCenterScraperV2()
-        movies = scraper.scrape()
-        save_ifc(movies)
-        results['ifc_center'] = {'success': True, 'count': len(movies)}
-        print(f"✅ IFC Center: {len(movies)} movies scraped\n")
+        save_all(scraped)
+        print()
     except Exception as e:
-        print(f"❌ IFC Center failed: {e}\n")
-        results['ifc_center'] = {'success': False, 'error': str(e)}
+        print(f"❌ Saving movies failed: {e}\n")
+        for step in scraped:
+            results[step] = {'success': False, 'count': 0, 'error': f"save failed: {e}"}
     
-    # 4. Enrich with TMDB data
+    # 4. Enrich with TMDB data (the executor block above waits for every scraper)
     print("🎬 STEP 4: Enriching with TMDB data...")
     print("-" * 60)
-    try:
-        enricher = TMDBEnricher()
-        enriched_count = enricher.enrich_all_unenriched(limit=100)
-        results['enrichment'] = {'success': True, 'count': enriched_count}
-        print(f"✅ TMDB Enrichment: {enriched_count} movies enriched\n")
-    except Exception as e:
-        print(f"❌ TMDB enrichment failed: {e}\n")
-        results['enrichment'] = {'success': False, 'error': str(e)}
+    saved_count = sum(len(movies) for step, movies in scraped.items()
+                      if results[step].get('success'))
+    if not saved_count:
+        print("⏭️  Nothing new was saved - skipping TMDB enrichment\n")
+        results['enrichment'] = {'success': True, 'count': 0}
+    else:
+        try:
+            enricher = get_enricher()
+            enriched_count = enricher.enrich_all_unenriched(limit=100)
+            results['enrichment'] = {'success': True, 'count': enriched_count}
+            print(f"✅ TMDB Enrichment: {enriched_count} movies enriched\n")
+        except Exception as e:
+            print(f"❌ TMDB enrichment failed: {e}\n")
+            results['enrichment'] = {'success': False, 'error': str(e)}
     
     # Summary
     print("="*60)
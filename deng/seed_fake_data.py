@@ -4,12 +4,17 @@ Run this to populate database with realistic test data
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from typing import Dict
 
 # Add utils to path
 sys.path.insert(0, str(Path(__file__).parent / 'utils'))
-from storage.postgres import insert_many_db, create_tables, db_select
+from storage.postgres import (
+    copy_binary_db, create_tables, refresh_recent_movies, db_session, deferred_indexes,
+    MOVIES_COPY_TYPES, MOVIES_SECONDARY_INDEXES
+)
 
 # Fake movie data for each theater
 FAKE_MOVIES = {
@@ -152,70 +157,103 @@ THEATER_INFO = {
 }
 
 
-def seed_fake_data():
-    """Insert fake movie data into database"""
-    print("=" * 60)
-    print("SEEDING FAKE DATA FOR TESTING")
-    print("=" * 60)
+SEED_COLUMNS = ['title', 'theater', 'theater_id', 'location', 'website', 
+                'director', 'year', 'dates', 'description', 'scraped_at']
+SEED_TYPES = [MOVIES_COPY_TYPES[col] for col in SEED_COLUMNS]
+
+
+def seed_timestamp() -> datetime:
+    """Today at midnight, so re-seeding the same day hits UNIQUE(title, theater, scraped_at)"""
+    return datetime.combine(date.today(), datetime.min.time())
+
+
+def fake_theater_columns(theater_id: str, scraped_at: datetime) -> Dict[str, list]:
+    """Build one theater's fake movies column-wise: one list per SEED_COLUMNS entry"""
+    movies = FAKE_MOVIES[theater_id]
+    theater_info = THEATER_INFO[theater_id]
+    n = len(movies)
     
-    # Ensure tables exist
-    try:
-        create_tables()
-    except Exception as e:
-        print(f"Warning: {e}")
+    # One write per theater instead of one per movie
+    print(f"\n📽️  {theater_info['name']}: {n} movies\n"
+          + "\n".join(f"   ✓ {movie['title']}" for movie in movies))
     
-    # Check if data already exists
-    check_sql = "SELECT COUNT(*) FROM movies"
-    try:
-        result = db_select(check_sql)
-        existing_count = result[0][0] if result else 0
-        
-        if existing_count > 0:
-            print(f"\n⚠️  Database already contains {existing_count} movies.")
-            response = input("Delete existing data and seed fresh? (yes/no): ")
-            if response.lower() != 'yes':
-                print("Cancelled. No changes made.")
-                return
-            
-            # Delete existing data
-            from storage.postgres import db_execute
-            db_execute("DELETE FROM movies")
-            print("✅ Existing data deleted")
-    except Exception as e:
-        print(f"Note: {e}")
+    columns = {
+        'title': [movie['title'] for movie in movies],
+        'theater': [theater_info['name']] * n,
+        'theater_id': [theater_id] * n,
+        'location': [theater_info['location']] * n,
+        'website': [theater_info['website']] * n,
+    }
+    for col in ('director', 'year', 'dates', 'description'):
+        columns[col] = [movie.get(col) for movie in movies]
+    columns['scraped_at'] = [scraped_at] * n
     
-    # Prepare all data for bulk insert
-    all_movies = []
-    columns = ['title', 'theater', 'theater_id', 'location', 'website', 
-               'director', 'year', 'dates', 'description', 'scraped_at']
+    return {col: columns[col] for col in SEED_COLUMNS}
+
+
+def fake_movie_columns() -> Dict[str, list]:
+    """Build every theater's fake movies column-wise"""
+    scraped_at = seed_timestamp()
+    columns = {col: [] for col in SEED_COLUMNS}
     
-    scraped_at = datetime.now().isoformat()
+    for theater_id in FAKE_MOVIES:
+        for col, values in fake_theater_columns(theater_id, scraped_at).items():
+            columns[col] += values
     
-    for theater_id, movies in FAKE_MOVIES.items():
-        theater_info = THEATER_INFO[theater_id]
-        
-        print(f"\n📽️  {theater_info['name']}: {len(movies)} movies")
-        
-        for movie in movies:
-            all_movies.append((
-                movie['title'],
-                theater_info['name'],
-                theater_id,
-                theater_info['location'],
-                theater_info['website'],
-                movie.get('director'),
-                movie.get('year'),
-                movie.get('dates'),
-                movie.get('description'),
-                scraped_at
-            ))
-            print(f"   ✓ {movie['title']}")
+    return columns
+
+
+def load_theater(theater_id: str, scraped_at: datetime) -> int:
+    """COPY one theater's fake movies on its own pooled connection, returning the row count"""
+    columns = fake_theater_columns(theater_id, scraped_at)
+    
+    with db_session(synchronous_commit=False) as conn:
+        copy_binary_db('movies', SEED_COLUMNS, zip(*columns.values()), SEED_TYPES,
+                       conn=conn, on_conflict='DO NOTHING')
+    
+    return len(columns['title'])
+
+
+def seed_fake_data(fresh: bool = False):
+    """
+    Insert fake movie data into database
+    
+    Args:
+        fresh: If True, replace everything in movies with the fake data
+            (TRUNCATE + COPY FREEZE) instead of adding to it
+    """
+    print("=" * 60)
+    print("SEEDING FAKE DATA FOR TESTING")
+    print("=" * 60)
     
-    # Insert all data
     try:
-        insert_many_db('movies', columns, all_movies)
+        if fresh:
+            # Schema, truncate and load share one transaction (one commit, no WAL
+            # fsync wait); secondary indexes are rebuilt once after the load
+            with db_session(synchronous_commit=False) as conn:
+                create_tables(conn=conn)
+                
+                # Binary COPY transposes the columns back to rows lazily as it streams
+                columns = fake_movie_columns()
+                with deferred_indexes('movies', MOVIES_SECONDARY_INDEXES, conn):
+                    copy_binary_db('movies', SEED_COLUMNS, zip(*columns.values()), SEED_TYPES,
+                                   conn=conn, fresh_load=True)
+            total = len(columns['title'])
+        else:
+            create_tables()
+            
+            # One COPY stream per theater on separate connections, so client-side
+            # encoding overlaps server-side ingest; rows already seeded today are
+            # skipped by the unique constraint
+            scraped_at = seed_timestamp()
+            with ThreadPoolExecutor(max_workers=len(FAKE_MOVIES)) as executor:
+                total = sum(executor.map(lambda theater_id: load_theater(theater_id, scraped_at),
+                                         FAKE_MOVIES))
+        
+        refresh_recent_movies()
         print(f"\n{'='*60}")
-        print(f"✅ SUCCESS: Inserted {len(all_movies)} fake movies")
+        kept = "previous rows removed" if fresh else "existing rows left as-is"
+        print(f"✅ SUCCESS: Seeded {total} fake movies ({kept})")
         print(f"{'='*60}")
         print("\nYou can now:")
         print("1. Start the backend: cd backend/api && python app.py")
@@ -225,6 +263,12 @@ def seed_fake_data():
     except Exception as e:
         print(f"\n❌ Error inserting data: {e}")
 
-
 if __name__ == '__main__':
-    seed_fake_data()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Seed fake movie data for testing')
+    parser.add_argument('--fresh', action='store_true',
+                        help='Replace all existing movies instead of adding to them')
+    args = parser.parse_args()
+    
+    seed_fake_data(fresh=args.fresh)
@@ -3,32 +3,65 @@ PostgreSQL Database Utilities for Indieflix
 No ORM - direct SQL with psycopg2 and pandas support
 """
 
+import csv
+import io
 import os
+import re
+import struct
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import execute_values, NamedTupleCursor
+from psycopg2.pool import ThreadedConnectionPool
 import pandas as pd
-from typing import Optional, List, Dict, Any
+import pyarrow as pa
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Mapping
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-env_path = Path(__file__).parent.parent.parent.parent / '.env'
-load_dotenv(env_path)
+# Load environment variables from .env file, unless the environment
+# (e.g. docker-compose or Render) already provides the database settings
+if 'DB_HOST' not in os.environ:
+    load_dotenv(Path(__file__).parent.parent.parent.parent / '.env')
 
 
-def get_db_config() -> Dict[str, Any]:
-    """Get database configuration from environment variables"""
-    return {
+@lru_cache(maxsize=1)
+def get_db_config() -> Mapping[str, Any]:
+    """
+    Get database configuration from environment variables
+    
+    Read once per process; the returned mapping is read-only, so copy it
+    (dict(get_db_config())) before changing keys.
+    """
+    return MappingProxyType({
         'host': os.getenv('DB_HOST', 'indieflix-db'),
         'port': int(os.getenv('DB_PORT', 5432)),
         'database': os.getenv('DB_NAME', 'indieflix'),
         'user': os.getenv('DB_USER', 'indieflix'),
         'password': os.getenv('DB_PASSWORD', 'mypassword')
-    }
+    })
+
+
+class _Connection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has prepared"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
 
 
 def db_conn():
     """
-    Create and return a database connection
+    Create and return a new, unpooled database connection
+    
+    Helpers borrow from get_pool() instead; use db_session() or pooled_conn()
+    for regular work and keep this for one-off scripts and pool setup.
     
     Returns:
         psycopg2 connection object
@@ -42,10 +75,157 @@ def db_conn():
             conn.close()
     """
     config = get_db_config()
-    return psycopg2.connect(**config)
+    return psycopg2.connect(connection_factory=_Connection, **config)
+
+
+# Shared connection pool, created lazily on first use
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
 
 
-def db_execute(sql: str, params: Optional[tuple] = None, fetch: bool = False) -> Optional[List[tuple]]:
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Get the process-wide connection pool, creating it on first use
+    
+    Sized by DB_POOL_MIN (idle connections kept open, default 2) and
+    DB_POOL_MAX (default 16); size DB_POOL_MAX to at least the number of
+    threads per process that hit the database concurrently.
+    
+    Returns:
+        psycopg2 ThreadedConnectionPool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    minconn=int(os.getenv('DB_POOL_MIN', 2)),
+                    maxconn=int(os.getenv('DB_POOL_MAX', 16)),
+                    connection_factory=_Connection,
+                    **get_db_config()
+                )
+    return _pool
+
+
+@contextmanager
+def pooled_conn(conn=None) -> Iterator[Any]:
+    """
+    Borrow a connection from the pool and return it when done
+    
+    Args:
+        conn: Optional connection already held by the caller; it is yielded
+            as-is and not returned to the pool
+    
+    Example:
+        with pooled_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    """
+    if conn is not None:
+        yield conn
+        return
+    
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+@contextmanager
+def db_session(synchronous_commit: bool = True) -> Iterator[Any]:
+    """
+    Run several helpers as one unit of work on a single pooled connection
+    
+    Commits when the block exits normally and rolls back if it raises. Pass the
+    yielded connection to helpers via conn=...; helpers given a connection
+    never commit or close it themselves.
+    
+    Args:
+        synchronous_commit: If False, SET LOCAL synchronous_commit = off so the
+            commit doesn't wait for the WAL fsync. A crash can lose the last few
+            hundred ms of such commits but never corrupts data - fine for bulk
+            loads that can simply be re-run
+    
+    Example:
+        with db_session() as conn:
+            delete_db('movies', 'theater_id = %s', ('ifc_center',), conn=conn)
+            insert_many_db('movies', columns, rows, conn=conn)
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        if not synchronous_commit:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL synchronous_commit = off")
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+@contextmanager
+def _transaction(conn=None) -> Iterator[Any]:
+    """Yield the caller's connection untouched, or a db_session() of our own"""
+    if conn is not None:
+        yield conn
+        return
+    
+    with db_session() as conn:
+        yield conn
+
+
+# Unique names for server-side (named) cursors
+_cursor_ids = itertools.count(1)
+
+
+def _prepare_statement(conn, stmt_name: str, sql: str, params: Optional[tuple] = None) -> str:
+    """
+    PREPARE sql on this connection (once) and return the matching EXECUTE statement
+    
+    Args:
+        conn: Connection from db_conn() or the pool
+        stmt_name: Name for the server-side prepared statement
+        sql: Statement using %s placeholders
+        params: Parameters that will be passed to the EXECUTE
+    
+    Returns:
+        EXECUTE statement with %s placeholders for params
+    """
+    if stmt_name not in conn.prepared:
+        counter = itertools.count(1)
+        positional_sql = re.sub(r'%s', lambda _: f'${next(counter)}', sql)
+        with conn.cursor() as cur:
+            cur.execute(f"PREPARE {stmt_name} AS {positional_sql}")
+        conn.prepared.add(stmt_name)
+    
+    return _execute_sql(stmt_name, len(params) if params else 0)
+
+
+@lru_cache(maxsize=256)
+def _execute_sql(stmt_name: str, n_params: int) -> str:
+    """EXECUTE statement for a prepared statement taking n_params %s values"""
+    if not n_params:
+        return f"EXECUTE {stmt_name}"
+    return f"EXECUTE {stmt_name} ({', '.join(['%s'] * n_params)})"
+
+
+# Ids for statements db_execute(prepare=True) names automatically
+_statement_ids = itertools.count(1)
+
+
+@lru_cache(maxsize=256)
+def _statement_name(sql: str) -> str:
+    """Stable server-side statement name for a SQL string"""
+    return f"auto_{next(_statement_ids)}"
+
+
+def db_execute(sql: str, params: Optional[tuple] = None, fetch: bool = False,
+               conn=None, prepare: bool = False) -> Optional[List[tuple]]:
     """
     Execute SQL statement (INSERT, UPDATE, DELETE, or SELECT)
     
@@ -53,6 +233,11 @@ def db_execute(sql: str, params: Optional[tuple] = None, fetch: bool = False) ->
         sql: SQL statement to execute
         params: Optional tuple of parameters for parameterized query
         fetch: If True, fetch and return results (for SELECT queries)
+        conn: Optional connection to use instead of borrowing one from the pool;
+            writes on it are left for the caller to commit
+        prepare: If True, PREPARE the statement once per pooled connection and
+            EXECUTE it afterwards, skipping Postgres' parse/plan on repeat calls.
+            Placeholders must be plain scalar %s values (no IN %s tuples)
     
     Returns:
         List of tuples if fetch=True, None otherwise
@@ -71,28 +256,30 @@ def db_execute(sql: str, params: Optional[tuple] = None, fetch: bool = False) ->
             fetch=True
         )
     """
-    conn = db_conn()
-    try:
+    if fetch:
+        with pooled_conn(conn) as conn:
+            if prepare:
+                sql = _prepare_statement(conn, _statement_name(sql), sql, params)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+    
+    with _transaction(conn) as conn:
+        if prepare:
+            sql = _prepare_statement(conn, _statement_name(sql), sql, params)
         with conn.cursor() as cur:
             cur.execute(sql, params)
-            
-            if fetch:
-                results = cur.fetchall()
-                return results
-            else:
-                conn.commit()
-                return None
-    finally:
-        conn.close()
+    return None
 
 
-def db_select(sql: str, params: Optional[tuple] = None) -> List[tuple]:
+def db_select(sql: str, params: Optional[tuple] = None, conn=None) -> List[tuple]:
     """
     Execute SELECT query and return results
     
     Args:
         sql: SELECT SQL statement
         params: Optional tuple of parameters for parameterized query
+        conn: Optional connection to use instead of borrowing one from the pool
     
     Returns:
         List of tuples containing query results
@@ -100,16 +287,119 @@ def db_select(sql: str, params: Optional[tuple] = None) -> List[tuple]:
     Example:
         movies = db_select("SELECT * FROM movies WHERE year = %s", (2024,))
     """
-    return db_execute(sql, params, fetch=True)
+    return db_execute(sql, params, fetch=True, conn=conn)
+
+
+def db_select_records(sql: str, params: Optional[tuple] = None, conn=None) -> List[tuple]:
+    """
+    Execute SELECT query and return rows as namedtuples
+    
+    Rows support attribute access by column name (row.title) without building
+    a dict per row.
+    
+    Args:
+        sql: SELECT SQL statement
+        params: Optional tuple of parameters for parameterized query
+        conn: Optional connection to use instead of borrowing one from the pool
+    
+    Returns:
+        List of namedtuples containing query results
+    
+    Example:
+        for movie in db_select_records("SELECT title, year FROM movies LIMIT 10"):
+            print(movie.title, movie.year)
+    """
+    with pooled_conn(conn) as conn:
+        with conn.cursor(cursor_factory=NamedTupleCursor) as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+
+def db_select_json(sql: str, params: Optional[tuple] = None, order_by: Optional[str] = None,
+                   conn=None) -> List[Dict[str, Any]]:
+    """
+    Execute SELECT query and return rows as a list of dicts serialized by Postgres
+    
+    Wraps the query in json_agg, so the server builds the whole result as one
+    JSON document and the client decodes it in a single pass instead of
+    constructing a dict per row. Values come back as JSON types (timestamps
+    as ISO strings, NUMERIC as float).
+    
+    json_agg isn't guaranteed to keep an ORDER BY inside the wrapped query,
+    so ordering goes through order_by, which sorts inside the aggregate.
+    
+    Args:
+        sql: SELECT SQL statement (no trailing semicolon)
+        params: Optional tuple of parameters for parameterized query
+        order_by: Optional ORDER BY expression over the query's output columns
+        conn: Optional connection to use instead of borrowing one from the pool
+    
+    Returns:
+        List of dicts, one per row, sorted by order_by (unspecified order without it)
+    
+    Example:
+        theaters = db_select_json("SELECT theater_id, theater FROM movies GROUP BY 1, 2",
+                                  order_by='theater')
+    """
+    order = f" ORDER BY {order_by}" if order_by else ''
+    wrapped = f"SELECT COALESCE(json_agg(t{order}), '[]'::json) FROM ({sql}) t"
+    result = db_select(wrapped, params, conn=conn)
+    return result[0][0]
 
 
-def db_select_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
+def db_iter(sql: str, params: Optional[tuple] = None, itersize: int = 200,
+            conn=None) -> Iterator[Dict[str, Any]]:
+    """
+    Execute SELECT query with a server-side cursor and yield rows as dicts
+    
+    Rows are fetched itersize at a time, so memory stays flat regardless of
+    result size and the first row is available after one round-trip.
+    
+    Args:
+        sql: SELECT SQL statement
+        params: Optional tuple of parameters for parameterized query
+        itersize: Rows fetched from the server per round-trip
+        conn: Optional connection to use instead of borrowing one from the pool
+    
+    Example:
+        for movie in db_iter("SELECT title, year FROM movies"):
+            print(movie['title'])
+    """
+    with pooled_conn(conn) as conn:
+        with conn.cursor(name=f"stream_{next(_cursor_ids)}") as cur:
+            cur.itersize = itersize
+            cur.execute(sql, params)
+            
+            columns = None
+            for row in cur:
+                if columns is None:
+                    columns = [desc[0] for desc in cur.description]
+                yield dict(zip(columns, row))
+
+
+def _fetch_columns(sql: str, params: Optional[tuple], stmt_name: Optional[str],
+                   conn=None) -> tuple:
+    """Run a SELECT and return (column names, rows) from a plain DB-API cursor"""
+    with pooled_conn(conn) as conn:
+        if stmt_name:
+            sql = _prepare_statement(conn, stmt_name, sql, params)
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            columns = [desc.name for desc in cur.description]
+            return columns, cur.fetchall()
+
+
+def db_select_df(sql: str, params: Optional[tuple] = None,
+                 stmt_name: Optional[str] = None, conn=None) -> pd.DataFrame:
     """
     Execute SELECT query and return results as pandas DataFrame
     
     Args:
         sql: SELECT SQL statement
         params: Optional tuple of parameters for parameterized query
+        stmt_name: Optional name to run the query as a server-side prepared
+            statement, so Postgres parses and plans it once per connection
+        conn: Optional connection to use instead of borrowing one from the pool
     
     Returns:
         pandas DataFrame containing query results
@@ -118,21 +408,146 @@ def db_select_df(sql: str, params: Optional[tuple] = None) -> pd.DataFrame:
         df = db_select_df("SELECT * FROM movies WHERE theater = %s", ("IFC Center",))
         print(df.head())
     """
-    conn = db_conn()
-    try:
-        df = pd.read_sql_query(sql, conn, params=params)
-        return df
-    finally:
-        conn.close()
+    columns, rows = _fetch_columns(sql, params, stmt_name, conn)
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def db_select_arrow(sql: str, params: Optional[tuple] = None,
+                    stmt_name: Optional[str] = None, conn=None) -> pa.Table:
+    """
+    Execute SELECT query and return results as a pyarrow Table
+    
+    Builds the Arrow columns straight from the cursor, skipping the pandas
+    DataFrame (and its object-dtype copies) when the caller only needs Arrow.
+    
+    Args:
+        sql: SELECT SQL statement
+        params: Optional tuple of parameters for parameterized query
+        stmt_name: Optional name to run the query as a server-side prepared statement
+        conn: Optional connection to use instead of borrowing one from the pool
+    
+    Returns:
+        pyarrow Table containing query results
+    
+    Example:
+        table = db_select_arrow("SELECT title, year FROM movies WHERE year > %s", (2000,))
+    """
+    columns, rows = _fetch_columns(sql, params, stmt_name, conn)
+    if not rows:
+        return pa.table({name: pa.array([], type=pa.null()) for name in columns})
+    
+    return pa.table(dict(zip(columns, map(pa.array, zip(*rows)))))
+
+
+def db_copy_df(sql: str, params: Optional[tuple] = None,
+               parse_dates: Optional[List[str]] = None, conn=None) -> pd.DataFrame:
+    """
+    Execute SELECT query via COPY ... TO STDOUT and return results as pandas DataFrame
+    
+    Streams the result set as CSV and parses it with pandas' C reader instead of
+    building a Python object per cell, which is much faster for large result sets.
+    
+    Args:
+        sql: SELECT SQL statement (no trailing semicolon)
+        params: Optional tuple of parameters for parameterized query
+        parse_dates: Optional list of timestamp columns to parse
+        conn: Optional connection to use instead of borrowing one from the pool
+    
+    Returns:
+        pandas DataFrame containing query results
+    
+    Example:
+        df = db_copy_df("SELECT * FROM movies WHERE year > %s", (2000,), parse_dates=['scraped_at'])
+    """
+    with pooled_conn(conn) as conn:
+        with conn.cursor() as cur:
+            query = cur.mogrify(sql, params).decode() if params else sql
+            buf = io.StringIO()
+            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT CSV, HEADER, NULL '\\N')", buf)
+    
+    buf.seek(0)
+    # Only the explicit NULL marker is missing data - titles like "NA" stay strings
+    return pd.read_csv(buf, na_values=['\\N'], keep_default_na=False, parse_dates=parse_dates)
+
+
+# Cap on values per multi-row statement (half of Postgres' 65535 bind-parameter
+# limit), so page sizes stay bounded however wide the rows are
+MAX_STATEMENT_VALUES = 32767
+
+
+def _rows_per_statement(n_columns: int, page_size: int) -> int:
+    """Largest page size <= page_size that keeps one statement under MAX_STATEMENT_VALUES"""
+    return max(1, min(page_size, MAX_STATEMENT_VALUES // max(1, n_columns)))
+
+
+# SQL text builders, cached so hot write loops skip the join/format work
+@lru_cache(maxsize=256)
+def _insert_sql(table: str, columns: tuple) -> str:
+    """Single-row INSERT with one %s per column"""
+    placeholders = ', '.join(['%s'] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+@lru_cache(maxsize=256)
+def _insert_many_sql(table: str, columns: tuple, on_conflict: Optional[str] = None) -> str:
+    """Multi-row INSERT template for execute_values, with an optional ON CONFLICT action"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    if on_conflict:
+        sql += f" ON CONFLICT {on_conflict}"
+    return sql
+
+
+# Scraper re-runs hit UNIQUE(title, theater, scraped_at): refresh the mutable
+# schedule fields instead of failing the whole batch
+MOVIES_UPSERT = (
+    "(title, theater, scraped_at) DO UPDATE SET "
+    "dates = EXCLUDED.dates, description = EXCLUDED.description"
+)
+
+
+# Movies-table columns the scrapers fill, in the order movie_rows() builds them
+MOVIES_SCRAPE_COLUMNS = ['title', 'theater', 'theater_id', 'location', 'website', 'film_link',
+                         'director', 'year', 'dates', 'description', 'scraped_at']
+
+
+def movie_rows(movies: Iterable[Dict[str, Any]]) -> Iterator[tuple]:
+    """
+    Build MOVIES_SCRAPE_COLUMNS row tuples from scraped movie dicts
+    
+    Rows are generated lazily, so they can be streamed straight into
+    insert_many_db or copy_binary_db. Fields a scraper doesn't set go in as NULL.
+    
+    Args:
+        movies: Movie dicts from a scraper
+    
+    Returns:
+        Iterator of tuples, one per movie
+    
+    Example:
+        insert_many_db('movies', MOVIES_SCRAPE_COLUMNS, movie_rows(movies),
+                       on_conflict=MOVIES_UPSERT)
+    """
+    # Missing fields default to None; itemgetter builds each tuple in C
+    defaults = dict.fromkeys(MOVIES_SCRAPE_COLUMNS)
+    get_row = itemgetter(*MOVIES_SCRAPE_COLUMNS)
+    return (get_row({**defaults, **movie}) for movie in movies)
 
 
-def insert_db(table: str, data: Dict[str, Any]) -> None:
+@lru_cache(maxsize=256)
+def _update_sql(table: str, columns: tuple, where: str) -> str:
+    """UPDATE setting each column to a %s value"""
+    set_clause = ', '.join([f"{col} = %s" for col in columns])
+    return f"UPDATE {table} SET {set_clause} WHERE {where}"
+
+
+def insert_db(table: str, data: Dict[str, Any], conn=None) -> None:
     """
-    Insert a single row into a table
+    Insert a single row into a table (as a prepared statement, reused per connection)
     
     Args:
         table: Table name
         data: Dictionary of column:value pairs
+        conn: Optional connection (e.g. from db_session()); the caller commits
     
     Example:
         insert_db('movies', {
@@ -141,21 +556,28 @@ def insert_db(table: str, data: Dict[str, Any]) -> None:
             'year': 2024
         })
     """
-    columns = ', '.join(data.keys())
-    placeholders = ', '.join(['%s'] * len(data))
-    sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-    
-    db_execute(sql, tuple(data.values()))
+    sql = _insert_sql(table, tuple(data))
+    db_execute(sql, tuple(data.values()), conn=conn, prepare=True)
 
 
-def insert_many_db(table: str, columns: List[str], values: List[tuple]) -> None:
+def insert_many_db(table: str, columns: List[str], values: Iterable[tuple],
+                   page_size: int = 500, conn=None, on_conflict: Optional[str] = None) -> None:
     """
     Insert multiple rows into a table
     
+    Rows are sent as multi-row INSERT ... VALUES statements (page_size rows per
+    round-trip) and may be any iterable, e.g. a generator, so they are never
+    all materialized at once. All pages are written in one transaction.
+    
     Args:
         table: Table name
         columns: List of column names
-        values: List of tuples containing values for each row
+        values: Iterable of tuples containing values for each row
+        page_size: Rows per INSERT statement (capped so rows x columns stays
+            under MAX_STATEMENT_VALUES)
+        conn: Optional connection (e.g. from db_session()); the caller commits
+        on_conflict: Optional action appended as ON CONFLICT ..., e.g. 'DO NOTHING'
+            or MOVIES_UPSERT
     
     Example:
         insert_many_db(
@@ -167,17 +589,255 @@ def insert_many_db(table: str, columns: List[str], values: List[tuple]) -> None:
             ]
         )
     """
-    conn = db_conn()
-    try:
+    with _transaction(conn) as conn:
+        with conn.cursor() as cur:
+            sql = _insert_many_sql(table, tuple(columns), on_conflict)
+            page_size = _rows_per_statement(len(columns), page_size)
+            execute_values(cur, sql, values, page_size=page_size)
+
+
+@lru_cache(maxsize=256)
+def _update_many_sql(table: str, key_cols: tuple, update_cols: tuple) -> str:
+    """UPDATE ... FROM (VALUES %s) template for execute_values, joined on key_cols"""
+    set_clause = ', '.join([f"{col} = v.{col}" for col in update_cols])
+    join = ' AND '.join([f"{table}.{col} = v.{col}" for col in key_cols])
+    return (
+        f"UPDATE {table} SET {set_clause} "
+        f"FROM (VALUES %s) AS v({', '.join(key_cols + update_cols)}) "
+        f"WHERE {join}"
+    )
+
+
+def update_many_db(table: str, key_cols: List[str], update_cols: List[str],
+                   rows: Iterable[tuple], template: Optional[str] = None,
+                   page_size: int = 500, conn=None) -> None:
+    """
+    Update many rows with one UPDATE ... FROM (VALUES ...) statement per page
+    
+    The batched counterpart of update_db: instead of one round-trip and plan
+    per row, each page of rows is joined against the table on key_cols.
+    
+    Args:
+        table: Table name
+        key_cols: Columns identifying the row to update (e.g. ['id'])
+        update_cols: Columns to set
+        rows: Iterable of tuples (*key values, *update values)
+        template: Optional execute_values row template, e.g. '(%s::integer, %s, ...)'.
+            Pass explicit casts when a column may be NULL in every row of a page,
+            otherwise Postgres types the VALUES column as text
+        page_size: Rows per UPDATE statement (capped like insert_many_db)
+        conn: Optional connection (e.g. from db_session()); the caller commits
+    
+    Example:
+        update_many_db(
+            'movies', ['id'], ['dates', 'description'],
+            [(12, 'Jan 10-15', 'New print'), (13, 'Jan 12-18', None)]
+        )
+    """
+    sql = _update_many_sql(table, tuple(key_cols), tuple(update_cols))
+    page_size = _rows_per_statement(len(key_cols) + len(update_cols), page_size)
+    
+    with _transaction(conn) as conn:
+        with conn.cursor() as cur:
+            execute_values(cur, sql, rows, template=template, page_size=page_size)
+
+
+class _ChunkStream(io.RawIOBase):
+    """
+    Read-only file object over an iterator of byte chunks, for COPY FROM STDIN
+    
+    copy_expert pulls fixed-size reads; each read only advances the iterator
+    far enough to fill the buffer, so the full payload never exists in memory.
+    """
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = bytearray()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buf) -> int:
+        while len(self._pending) < len(buf):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending += chunk
+        
+        n = min(len(buf), len(self._pending))
+        buf[:n] = self._pending[:n]
+        del self._pending[:n]
+        return n
+
+
+def _csv_chunks(values: Iterable[tuple], chunk_size: int = 8192) -> Iterator[bytes]:
+    """Serialize rows to CSV (None as \\N), yielding roughly chunk_size bytes at a time"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    for row in values:
+        writer.writerow(['\\N' if value is None else value for value in row])
+        if text.tell() >= chunk_size:
+            yield text.getvalue().encode('utf-8')
+            text.seek(0)
+            text.truncate()
+    yield text.getvalue().encode('utf-8')
+
+
+def copy_many_db(table: str, columns: List[str], values: Iterable[tuple], conn=None,
+                 fresh_load: bool = False) -> None:
+    """
+    Bulk-load rows into a table with COPY ... FROM STDIN
+    
+    Fastest path for large loads (e.g. seeding): rows are serialized to CSV
+    client-side and streamed in one COPY instead of parsed as INSERT statements.
+    values may be a generator; rows are encoded as COPY reads them.
+    None is sent as the \\N NULL marker, so a literal '\\N' string would load as NULL.
+    
+    Args:
+        table: Table name
+        columns: List of column names
+        values: Iterable of tuples containing values for each row
+        conn: Optional connection (e.g. from db_session()); the caller commits
+        fresh_load: If True, TRUNCATE the table first and COPY WITH FREEZE, so
+            rows are written already frozen and never need a VACUUM FREEZE pass
+    
+    Example:
+        copy_many_db(
+            'movies',
+            ['title', 'theater', 'theater_id', 'scraped_at'],
+            [('Anora', 'Metrograph', 'metrograph', datetime.now())]
+        )
+    """
+    with _transaction(conn) as conn:
+        with conn.cursor() as cur:
+            columns_str = ', '.join(columns)
+            freeze = ''
+            if fresh_load:
+                cur.execute(f"TRUNCATE {table}")
+                freeze = ', FREEZE'
+            cur.copy_expert(
+                f"COPY {table} ({columns_str}) FROM STDIN WITH (FORMAT CSV, NULL '\\N'{freeze})",
+                _ChunkStream(_csv_chunks(values))
+            )
+
+
+# PGCOPY binary framing: signature, flags field, header extension length
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
+_PG_EPOCH = datetime(2000, 1, 1)
+
+
+def _encode_timestamp(value) -> bytes:
+    """TIMESTAMP as int64 microseconds since 2000-01-01 (accepts datetime or ISO string)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    delta = value.replace(tzinfo=None) - _PG_EPOCH
+    return struct.pack('>q', (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+# Binary send format per Postgres type name accepted by copy_binary_db
+_BINARY_ENCODERS = {
+    'text': lambda value: str(value).encode('utf-8'),
+    'varchar': lambda value: str(value).encode('utf-8'),
+    'int4': lambda value: struct.pack('>i', int(value)),
+    'int8': lambda value: struct.pack('>q', int(value)),
+    'float8': lambda value: struct.pack('>d', float(value)),
+    'bool': lambda value: b'\x01' if value else b'\x00',
+    'timestamp': _encode_timestamp,
+}
+
+# Binary COPY types for the movies columns the scrapers write
+MOVIES_COPY_TYPES = {
+    'title': 'varchar', 'theater': 'varchar', 'theater_id': 'varchar',
+    'location': 'varchar', 'website': 'varchar', 'film_link': 'varchar',
+    'director': 'varchar', 'year': 'int4', 'dates': 'varchar',
+    'description': 'text', 'scraped_at': 'timestamp',
+}
+
+
+def _binary_chunks(values: Iterable[tuple], encoders: List) -> Iterator[bytes]:
+    """Frame rows as PGCOPY binary tuples: int16 field count, then int32 length + bytes per field"""
+    yield _PGCOPY_HEADER
+    
+    field_count = struct.pack('>h', len(encoders))
+    null_field = struct.pack('>i', -1)
+    for row in values:
+        parts = [field_count]
+        for encode, value in zip(encoders, row):
+            if value is None:
+                parts.append(null_field)
+            else:
+                data = encode(value)
+                parts.append(struct.pack('>i', len(data)))
+                parts.append(data)
+        yield b''.join(parts)
+    
+    yield _PGCOPY_TRAILER
+
+
+def copy_binary_db(table: str, columns: List[str], values: Iterable[tuple],
+                   types: List[str], conn=None, on_conflict: Optional[str] = None,
+                   fresh_load: bool = False) -> None:
+    """
+    Bulk-load rows with COPY ... FROM STDIN WITH (FORMAT BINARY)
+    
+    Like copy_many_db, but each value is sent in Postgres' binary wire format,
+    so the server skips text parsing of ints and timestamps entirely.
+    
+    Args:
+        table: Table name
+        columns: List of column names
+        values: Iterable of tuples containing values for each row
+        types: Postgres type per column, one of _BINARY_ENCODERS' keys
+            (see MOVIES_COPY_TYPES for the movies table)
+        conn: Optional connection (e.g. from db_session()); the caller commits
+        on_conflict: Optional ON CONFLICT action (e.g. MOVIES_UPSERT). COPY itself
+            can't resolve conflicts, so rows are copied into a temp table first
+            and moved over with one INSERT ... SELECT ... ON CONFLICT (the temp
+            table is dropped on commit, so use it once per transaction)
+        fresh_load: If True, TRUNCATE the table first and COPY WITH FREEZE (see
+            copy_many_db); can't be combined with on_conflict
+    
+    Example:
+        columns = ['title', 'theater', 'theater_id', 'year', 'scraped_at']
+        copy_binary_db(
+            'movies', columns,
+            [('Anora', 'Metrograph', 'metrograph', 2024, datetime.now())],
+            [MOVIES_COPY_TYPES[col] for col in columns]
+        )
+    """
+    if fresh_load and on_conflict:
+        raise ValueError("fresh_load truncates the table; on_conflict has nothing to resolve")
+    
+    encoders = [_BINARY_ENCODERS[type_name] for type_name in types]
+    
+    with _transaction(conn) as conn:
         with conn.cursor() as cur:
             columns_str = ', '.join(columns)
-            placeholders = ', '.join(['%s'] * len(columns))
-            sql = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
+            target = table
+            freeze = ''
+            if fresh_load:
+                cur.execute(f"TRUNCATE {table}")
+                freeze = ', FREEZE'
+            if on_conflict:
+                target = f"_copy_{table}"
+                # Only the copied columns - no defaults, so staging doesn't draw ids
+                # from the table's serial sequence
+                cur.execute(
+                    f"CREATE TEMP TABLE {target} ON COMMIT DROP AS "
+                    f"SELECT {columns_str} FROM {table} WITH NO DATA"
+                )
             
-            cur.executemany(sql, values)
-            conn.commit()
-    finally:
-        conn.close()
+            cur.copy_expert(
+                f"COPY {target} ({columns_str}) FROM STDIN WITH (FORMAT BINARY{freeze})",
+                _ChunkStream(_binary_chunks(values, encoders))
+            )
+            
+            if on_conflict:
+                cur.execute(
+                    f"INSERT INTO {table} ({columns_str}) "
+                    f"SELECT {columns_str} FROM {target} ON CONFLICT {on_conflict}"
+                )
 
 
 def insert_df(df: pd.DataFrame, table: str, if_exists: str = 'append') -> None:
@@ -196,22 +856,24 @@ def insert_df(df: pd.DataFrame, table: str, if_exists: str = 'append') -> None:
         })
         insert_df(df, 'movies', if_exists='append')
     """
-    conn = db_conn()
-    try:
+    with db_session() as conn:
         df.to_sql(table, conn, if_exists=if_exists, index=False)
-    finally:
-        conn.close()
 
 
-def update_db(table: str, data: Dict[str, Any], where: str, where_params: tuple) -> None:
+def update_db(table: str, data: Dict[str, Any], where: str, where_params: tuple,
+              conn=None) -> None:
     """
     Update rows in a table
     
+    Runs as a prepared statement, so per-record update loops only pay
+    Postgres' parse/plan cost once per connection.
+    
     Args:
         table: Table name
         data: Dictionary of column:value pairs to update
         where: WHERE clause (without 'WHERE' keyword)
-        where_params: Tuple of parameters for WHERE clause
+        where_params: Tuple of scalar parameters for WHERE clause
+        conn: Optional connection to use instead of borrowing one from the pool
     
     Example:
         update_db(
@@ -221,14 +883,47 @@ def update_db(table: str, data: Dict[str, Any], where: str, where_params: tuple)
             ('The Substance', 'IFC Center')
         )
     """
-    set_clause = ', '.join([f"{col} = %s" for col in data.keys()])
-    sql = f"UPDATE {table} SET {set_clause} WHERE {where}"
-    
+    sql = _update_sql(table, tuple(data), where)
     params = tuple(data.values()) + where_params
-    db_execute(sql, params)
+    db_execute(sql, params, conn=conn, prepare=True)
 
 
-def delete_db(table: str, where: str, where_params: tuple) -> None:
+# TMDB enrichment columns written by bulk_update_movies, in row order after id
+ENRICHMENT_COLUMNS = [
+    'tmdb_id', 'poster_path', 'backdrop_path', 'poster_url', 'backdrop_url',
+    'runtime', 'tmdb_rating', 'genres', 'cast_members', 'tmdb_overview', 'enriched_at'
+]
+
+
+# Explicit casts so NULLs in VALUES don't default to text
+_BULK_UPDATE_TEMPLATE = (
+    "(%s::integer, %s::integer, %s, %s, %s, %s, %s::integer, %s::numeric, "
+    "%s, %s, %s, %s::timestamp)"
+)
+
+
+def bulk_update_movies(rows: List[tuple], conn=None) -> None:
+    """
+    Update TMDB enrichment columns for many movies in a single statement
+    
+    Args:
+        rows: List of tuples (id, *values in ENRICHMENT_COLUMNS order)
+        conn: Optional connection (e.g. from db_session()); the caller commits
+    
+    Example:
+        bulk_update_movies([
+            (12, 550, '/abc.jpg', None, 'https://...', None, 139, 8.4, 'Drama', 'Brad Pitt', '...',
+             datetime.now())
+        ])
+    """
+    if not rows:
+        return
+    
+    update_many_db('movies', ['id'], ENRICHMENT_COLUMNS, rows,
+                   template=_BULK_UPDATE_TEMPLATE, page_size=len(rows), conn=conn)
+
+
+def delete_db(table: str, where: str, where_params: tuple, conn=None) -> None:
     """
     Delete rows from a table
     
@@ -236,145 +931,243 @@ def delete_db(table: str, where: str, where_params: tuple) -> None:
         table: Table name
         where: WHERE clause (without 'WHERE' keyword)
         where_params: Tuple of parameters for WHERE clause
+        conn: Optional connection (e.g. from db_session()); the caller commits
     
     Example:
         delete_db('movies', 'scraped_at < %s', ('2024-01-01',))
     """
     sql = f"DELETE FROM {table} WHERE {where}"
-    db_execute(sql, where_params)
+    db_execute(sql, where_params, conn=conn)
 
 
-def table_exists(table_name: str) -> bool:
+def table_exists(table_name: str, conn=None) -> bool:
     """
     Check if a table exists in the database
     
+    Resolved with to_regclass, a direct pg_class lookup along search_path,
+    rather than the multi-join information_schema.tables view.
+    
     Args:
-        table_name: Name of the table to check
+        table_name: Name of the table to check (optionally schema-qualified)
+        conn: Optional connection to use instead of borrowing one from the pool
     
     Returns:
         True if table exists, False otherwise
     """
-    sql = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = %s
-        )
-    """
-    result = db_select(sql, (table_name,))
+    sql = "SELECT to_regclass(%s) IS NOT NULL"
+    result = db_select(sql, (table_name,), conn=conn)
     return result[0][0] if result else False
 
 
-def create_tables():
+def refresh_recent_movies(conn=None) -> None:
+    """
+    Refresh the mv_recent_movies materialized view
+    
+    Call after scrapes or enrichment change the movies table. CONCURRENTLY
+    keeps the view readable by the API while it is rebuilt.
+    
+    Args:
+        conn: Optional connection (e.g. from db_session()); the caller commits
+    """
+    db_execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_recent_movies", conn=conn)
+
+
+# Secondary movies indexes a bulk load can drop and rebuild; the UNIQUE
+# constraint stays, since ON CONFLICT needs it
+MOVIES_SECONDARY_INDEXES = [
+    'idx_movies_theater', 'idx_movies_scraped', 'idx_movies_tmdb_id', 'idx_movies_enriched',
+    'idx_movies_title_theater_scraped', 'idx_movies_theater_scraped',
+    'idx_movies_unenriched', 'idx_movies_title_trgm',
+]
+
+
+@contextmanager
+def deferred_indexes(table: str, index_names: List[str], conn) -> Iterator[None]:
+    """
+    Drop indexes for the duration of a bulk load and rebuild them afterwards
+    
+    Building an index once over the loaded rows is cheaper than updating it
+    row by row. Runs on the caller's transaction, so a failed load rolls the
+    DROP back too; other sessions block on the table until it commits.
+    
+    Args:
+        table: Table the indexes belong to
+        index_names: Indexes to defer (missing ones are ignored)
+        conn: Connection from db_session(); required
+    
+    Example:
+        with db_session() as conn:
+            with deferred_indexes('movies', MOVIES_SECONDARY_INDEXES, conn):
+                copy_many_db('movies', columns, rows, conn=conn)
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = %s AND indexname = ANY(%s)
+        """, (table, list(index_names)))
+        definitions = cur.fetchall()
+        if definitions:
+            cur.execute(f"DROP INDEX {', '.join(name for name, _ in definitions)}")
+    
+    yield
+    
+    if definitions:
+        with conn.cursor() as cur:
+            cur.execute('; '.join(indexdef for _, indexdef in definitions))
+
+
+# Advisory lock key held while create_tables() runs its DDL
+SCHEMA_LOCK_ID = 8472923
+
+
+# Whole schema as one multi-statement string, sent to the server in a single
+# round-trip (psycopg2 runs it in simple-query mode)
+SCHEMA_DDL = """
+-- Movies table
+CREATE TABLE IF NOT EXISTS movies (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(500) NOT NULL,
+    theater VARCHAR(200) NOT NULL,
+    theater_id VARCHAR(100) NOT NULL,
+    location VARCHAR(300),
+    website VARCHAR(300),
+    film_link VARCHAR(500),
+    director VARCHAR(300),
+    year INTEGER,
+    dates VARCHAR(200),
+    description TEXT,
+    scraped_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(title, theater, scraped_at)
+);
+
+-- Create indexes for faster queries
+CREATE INDEX IF NOT EXISTS idx_movies_theater
+ON movies(theater_id);
+
+CREATE INDEX IF NOT EXISTS idx_movies_scraped
+ON movies(scraped_at DESC);
+
+-- Add updated_at column if it doesn't exist (needed for trigger)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name='movies' AND column_name='updated_at'
+    ) THEN
+        ALTER TABLE movies ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+    END IF;
+END $$;
+
+-- Add TMDB enrichment columns if they don't exist
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name='movies' AND column_name='tmdb_id'
+    ) THEN
+        ALTER TABLE movies ADD COLUMN tmdb_id INTEGER;
+        ALTER TABLE movies ADD COLUMN poster_url VARCHAR(500);
+        ALTER TABLE movies ADD COLUMN backdrop_url VARCHAR(500);
+        ALTER TABLE movies ADD COLUMN runtime INTEGER;
+        ALTER TABLE movies ADD COLUMN tmdb_rating DECIMAL(3,1);
+        ALTER TABLE movies ADD COLUMN genres TEXT;
+        ALTER TABLE movies ADD COLUMN cast_members TEXT;
+        ALTER TABLE movies ADD COLUMN tmdb_overview TEXT;
+        ALTER TABLE movies ADD COLUMN enriched_at TIMESTAMP;
+    END IF;
+END $$;
+
+-- Raw TMDB image paths, so poster/backdrop URLs can be rebuilt
+-- if the image base URL or sizes change
+ALTER TABLE movies ADD COLUMN IF NOT EXISTS poster_path VARCHAR(200);
+ALTER TABLE movies ADD COLUMN IF NOT EXISTS backdrop_path VARCHAR(200);
+
+-- Create indexes for TMDB columns
+CREATE INDEX IF NOT EXISTS idx_movies_tmdb_id
+ON movies(tmdb_id);
+
+CREATE INDEX IF NOT EXISTS idx_movies_enriched
+ON movies(enriched_at DESC);
+
+-- DISTINCT ON (title, theater_id) ... ORDER BY title, theater_id, scraped_at DESC
+CREATE INDEX IF NOT EXISTS idx_movies_title_theater_scraped
+ON movies(title, theater_id, scraped_at DESC);
+
+-- Per-theater lookups over the latest scrape window
+CREATE INDEX IF NOT EXISTS idx_movies_theater_scraped
+ON movies(theater_id, scraped_at DESC) INCLUDE (title);
+
+-- Enrichment queue: only the (few) unenriched rows are indexed
+CREATE INDEX IF NOT EXISTS idx_movies_unenriched
+ON movies(scraped_at DESC) WHERE enriched_at IS NULL;
+
+-- Trigram index so /api/search's title ILIKE '%q%' avoids a full scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_movies_title_trgm
+ON movies USING gin (title gin_trgm_ops);
+
+-- Create trigger function for auto-updating updated_at
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Create trigger
+DROP TRIGGER IF EXISTS update_movies_updated_at ON movies;
+
+CREATE TRIGGER update_movies_updated_at
+    BEFORE UPDATE ON movies
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Latest row per (title, theater) from the most recent scrape window,
+-- so API reads skip the MAX(scraped_at) subquery and DISTINCT ON sort
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_recent_movies AS
+SELECT DISTINCT ON (title, theater_id)
+    id, title, theater, theater_id, location, website, film_link,
+    director, year, dates, description, scraped_at,
+    poster_url, backdrop_url, runtime, tmdb_rating, genres,
+    cast_members, tmdb_overview, enriched_at
+FROM movies
+WHERE scraped_at >= (
+    SELECT MAX(scraped_at) - INTERVAL '1 day'
+    FROM movies
+)
+ORDER BY title, theater_id, scraped_at DESC;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_recent_movies_title_theater
+ON mv_recent_movies(title, theater_id);
+
+CREATE INDEX IF NOT EXISTS idx_mv_recent_movies_theater
+ON mv_recent_movies(theater_id);
+"""
+
+
+def create_tables(conn=None):
     """
     Create necessary tables for Indieflix if they don't exist
+    
+    Guarded by a transaction-level advisory lock: when several processes
+    (e.g. gunicorn workers) start at once, they run the DDL one at a time and
+    each waits until the previous one has committed, so no caller returns
+    before the tables exist.
+    
+    Args:
+        conn: Optional connection (e.g. from db_session()); the DDL then commits
+            with the caller's transaction
     """
-    conn = db_conn()
-    try:
+    with _transaction(conn) as conn:
         with conn.cursor() as cur:
-            # Movies table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS movies (
-                    id SERIAL PRIMARY KEY,
-                    title VARCHAR(500) NOT NULL,
-                    theater VARCHAR(200) NOT NULL,
-                    theater_id VARCHAR(100) NOT NULL,
-                    location VARCHAR(300),
-                    website VARCHAR(300),
-                    film_link VARCHAR(500),
-                    director VARCHAR(300),
-                    year INTEGER,
-                    dates VARCHAR(200),
-                    description TEXT,
-                    scraped_at TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(title, theater, scraped_at)
-                )
-            """)
-            
-            # Create indexes for faster queries
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_movies_theater 
-                ON movies(theater_id)
-            """)
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            cur.execute(SCHEMA_DDL)
             
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_movies_scraped 
-                ON movies(scraped_at DESC)
-            """)
-            
-            # Add updated_at column if it doesn't exist (needed for trigger)
-            cur.execute("""
-                DO $$ 
-                BEGIN
-                    IF NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns 
-                        WHERE table_name='movies' AND column_name='updated_at'
-                    ) THEN
-                        ALTER TABLE movies ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
-                    END IF;
-                END $$;
-            """)
-            
-            # Add TMDB enrichment columns if they don't exist
-            cur.execute("""
-                DO $$ 
-                BEGIN
-                    IF NOT EXISTS (
-                        SELECT 1 FROM information_schema.columns 
-                        WHERE table_name='movies' AND column_name='tmdb_id'
-                    ) THEN
-                        ALTER TABLE movies ADD COLUMN tmdb_id INTEGER;
-                        ALTER TABLE movies ADD COLUMN poster_url VARCHAR(500);
-                        ALTER TABLE movies ADD COLUMN backdrop_url VARCHAR(500);
-                        ALTER TABLE movies ADD COLUMN runtime INTEGER;
-                        ALTER TABLE movies ADD COLUMN tmdb_rating DECIMAL(3,1);
-                        ALTER TABLE movies ADD COLUMN genres TEXT;
-                        ALTER TABLE movies ADD COLUMN cast_members TEXT;
-                        ALTER TABLE movies ADD COLUMN tmdb_overview TEXT;
-                        ALTER TABLE movies ADD COLUMN enriched_at TIMESTAMP;
-                    END IF;
-                END $$;
-            """)
-            
-            # Create indexes for TMDB columns
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_movies_tmdb_id
-                ON movies(tmdb_id)
-            """)
-            
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_movies_enriched
-                ON movies(enriched_at DESC)
-            """)
-            
-            # Create trigger function for auto-updating updated_at
-            cur.execute("""
-                CREATE OR REPLACE FUNCTION update_updated_at_column()
-                RETURNS TRIGGER AS $$
-                BEGIN
-                    NEW.updated_at = CURRENT_TIMESTAMP;
-                    RETURN NEW;
-                END;
-                $$ language 'plpgsql'
-            """)
-            
-            # Create trigger
-            cur.execute("""
-                DROP TRIGGER IF EXISTS update_movies_updated_at ON movies
-            """)
-            
-            cur.execute("""
-                CREATE TRIGGER update_movies_updated_at
-                    BEFORE UPDATE ON movies
-                    FOR EACH ROW
-                    EXECUTE FUNCTION update_updated_at_column()
-            """)
-            
-            conn.commit()
             print("✅ Database tables created successfully")
-    finally:
-        conn.close()
 
 
 if __name__ == '__main__':
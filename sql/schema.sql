@@ -18,6 +18,8 @@ CREATE TABLE IF NOT EXISTS movies (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     tmdb_id INTEGER,
+    poster_path VARCHAR(200),
+    backdrop_path VARCHAR(200),
     poster_url VARCHAR(500),
     backdrop_url VARCHAR(500),
     runtime INTEGER,
@@ -42,6 +44,22 @@ ON movies(tmdb_id);
 CREATE INDEX IF NOT EXISTS idx_movies_enriched
 ON movies(enriched_at DESC);
 
+-- Supports DISTINCT ON (title, theater_id) ... ORDER BY title, theater_id, scraped_at DESC
+CREATE INDEX IF NOT EXISTS idx_movies_title_theater_scraped
+ON movies(title, theater_id, scraped_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_movies_theater_scraped
+ON movies(theater_id, scraped_at DESC) INCLUDE (title);
+
+-- Partial index for the enrichment queue (WHERE enriched_at IS NULL ORDER BY scraped_at DESC)
+CREATE INDEX IF NOT EXISTS idx_movies_unenriched
+ON movies(scraped_at DESC) WHERE enriched_at IS NULL;
+
+-- Trigram index for title ILIKE '%q%' search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_movies_title_trgm
+ON movies USING gin (title gin_trgm_ops);
+
 -- Trigger function to auto-update updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -58,6 +76,28 @@ CREATE TRIGGER update_movies_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Latest row per (title, theater) from the most recent scrape window.
+-- Refresh after scrapes/enrichment: REFRESH MATERIALIZED VIEW CONCURRENTLY mv_recent_movies;
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_recent_movies AS
+SELECT DISTINCT ON (title, theater_id)
+    id, title, theater, theater_id, location, website, film_link,
+    director, year, dates, description, scraped_at,
+    poster_url, backdrop_url, runtime, tmdb_rating, genres,
+    cast_members, tmdb_overview, enriched_at
+FROM movies
+WHERE scraped_at >= (
+    SELECT MAX(scraped_at) - INTERVAL '1 day'
+    FROM movies
+)
+ORDER BY title, theater_id, scraped_at DESC;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_recent_movies_title_theater
+ON mv_recent_movies(title, theater_id);
+
+CREATE INDEX IF NOT EXISTS idx_mv_recent_movies_theater
+ON mv_recent_movies(theater_id);
+
 -- Comments
 COMMENT ON TABLE movies IS 'Stores movie screening information from NYC arthouse theaters';
 COMMENT ON COLUMN movies.title IS 'Movie title';
@@ -74,6 +114,8 @@ COMMENT ON COLUMN movies.scraped_at IS 'Timestamp when data was scraped';
 COMMENT ON COLUMN movies.created_at IS 'Timestamp when record was created';
 COMMENT ON COLUMN movies.updated_at IS 'Timestamp when record was last modified (auto-updated)';
 COMMENT ON COLUMN movies.tmdb_id IS 'The Movie Database (TMDB) unique identifier';
+COMMENT ON COLUMN movies.poster_path IS 'TMDB poster file path (e.g., "/abc123.jpg")';
+COMMENT ON COLUMN movies.backdrop_path IS 'TMDB backdrop file path';
 COMMENT ON COLUMN movies.poster_url IS 'TMDB poster image URL (w342 size)';
 COMMENT ON COLUMN movies.backdrop_url IS 'TMDB backdrop image URL';
 COMMENT ON COLUMN movies.runtime IS 'Movie runtime in minutes';